@@ -0,0 +1,82 @@
+"""
+Memory per block for a fully loaded visible range, measured with
+tracemalloc: a sprite with per-instance properties for every cell as
+before, the ``Block`` sprite for rendered cells only, and a ``BlockRecord``
+for every cell. A ``Block`` costs about as much as the old sprite, arcade
+sprites keep a ``__dict__``, so its saving is only the sky cells it skips.
+
+    python benchmarks/bench_blocks.py
+"""
+import tracemalloc
+
+import arcade
+from common import config, generate_chunks, report
+
+from block.block import BLOCK_TEXTURES, Block, BlockRecord
+
+
+class LegacyBlock(arcade.Sprite):
+    """The block sprite used before, with the per-type fields on every instance"""
+
+    def __init__(self, width, height, breaking_time, hp, block_id, bright, center_x=0, center_y=0):
+        super().__init__(BLOCK_TEXTURES[block_id], center_x=center_x, center_y=center_y)
+        self.block_id = block_id
+        self.width = width
+        self.height = height
+        self.breaking_time = breaking_time
+
+
+def _legacy(chunks):
+    size = config.SPRITE_PIXEL_SIZE
+    return [
+        LegacyBlock(size, size, 2, 2, block_id, False, center_x=(chunk.x + x) * size, center_y=y * size)
+        for chunk in chunks
+        for y, row in enumerate(chunk.blocks.tolist())
+        for x, block_id in enumerate(row)
+    ]
+
+
+def _rendered(chunks):
+    size = config.SPRITE_PIXEL_SIZE
+    return [
+        Block(block_id, center_x=(chunk.x + x) * size, center_y=y * size)
+        for chunk in chunks
+        for y, row in enumerate(chunk.blocks.tolist())
+        for x, block_id in enumerate(row)
+        if block_id > 129
+    ]
+
+
+def _records(chunks):
+    return [
+        BlockRecord(chunk.x + x, y, block_id)
+        for chunk in chunks
+        for y, row in enumerate(chunk.blocks.tolist())
+        for x, block_id in enumerate(row)
+    ]
+
+
+def _measure(build, chunks):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    blocks = build(chunks)
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return len(blocks), allocated
+
+
+def main():
+    # Every chunk the visible range can touch
+    half_width = (config.VISIBLE_RANGE_MAX // config.CHUNK_WIDTH + 1) * config.CHUNK_WIDTH
+    chunks = list(generate_chunks(-half_width, half_width).values())
+    cells = sum(chunk.blocks.size for chunk in chunks)
+
+    rows = [["", "objects", "bytes/object", "bytes/cell"]]
+    for name, build in (("legacy sprite", _legacy), ("Block sprite", _rendered), ("BlockRecord", _records)):
+        count, allocated = _measure(build, chunks)
+        rows.append([name, count, allocated // count, allocated // cells])
+    report(f"{len(chunks)} chunks, {cells} cells", rows)
+
+
+if __name__ == "__main__":
+    main()
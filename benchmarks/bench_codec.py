@@ -0,0 +1,63 @@
+"""
+Chunk payload size and decode throughput of the chunk codec, zlib over the
+raw block array, against gzip + pickle of the old ``(x, y) -> block_id``
+dict. The codec decodes into a new array or into an existing one.
+
+    python benchmarks/bench_codec.py [worlds]
+"""
+import gzip
+import pickle
+import sys
+from time import perf_counter
+
+import numpy as np
+from common import config, generate_chunks, report
+
+from misc import codec
+
+SHAPE = (config.CHUNK_HEIGHT, config.CHUNK_WIDTH)
+# The game decodes into the chunk's own array, reuse one here
+_OUT = np.empty(SHAPE, dtype=np.uint8)
+
+
+def _decode_pickle(payload: bytes):
+    return pickle.loads(gzip.decompress(payload))
+
+
+def _decode_into(payload: bytes):
+    return codec.decode_into(payload, _OUT)
+
+
+FORMATS = {
+    "gzip + pickle": (lambda chunk: gzip.compress(pickle.dumps(dict(chunk.data))), _decode_pickle),
+    "codec": (lambda chunk: codec.encode(chunk.blocks), codec.decode),
+    "codec into": (lambda chunk: codec.encode(chunk.blocks), _decode_into),
+}
+
+
+def main(worlds: int = 3):
+    chunks = [chunk for _ in range(worlds) for chunk in generate_chunks().values()]
+
+    rows = [["", "bytes/chunk", "encode us", "decode us", "chunks/s"]]
+    for name, (encode, decode) in FORMATS.items():
+        start = perf_counter()
+        payloads = [encode(chunk) for chunk in chunks]
+        encode_s = perf_counter() - start
+
+        start = perf_counter()
+        for payload in payloads:
+            decode(payload)
+        decode_s = perf_counter() - start
+
+        rows.append([
+            name,
+            sum(map(len, payloads)) // len(payloads),
+            f"{encode_s / len(chunks) * 1e6:.1f}",
+            f"{decode_s / len(chunks) * 1e6:.1f}",
+            int(len(chunks) / decode_s),
+        ])
+    report(f"{len(chunks)} chunks from {worlds} generated worlds", rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,61 @@
+"""
+Physics step time and collision sprite count with every solid block as a
+wall against the exposed-surface collision layer.
+
+    python benchmarks/bench_collision.py [chunks] [steps]
+"""
+import sys
+from time import perf_counter
+
+import arcade
+from common import config, generate_chunks, link_neighbours, report
+
+
+def _walls(chunks, layer: str):
+    if layer == "whole chunks":
+        # One sprite list per chunk, as before chunks were split into sections
+        walls = []
+        for chunk in chunks:
+            sprites = arcade.SpriteList(use_spatial_hash=True, lazy=True)
+            for section in chunk._blocks.values():
+                sprites.extend(section)
+            walls.append(sprites)
+        return walls
+    if layer == "solid sections":
+        return [sprites for chunk in chunks for sprites in chunk._blocks.values()]
+    return [sprites for chunk in chunks for sprites in chunk._walls.values()]
+
+
+def _step_us(chunks, walls, steps: int) -> float:
+    # Stand the player on the surface of the middle chunk
+    chunk = chunks[len(chunks) // 2]
+    surface = int((chunk.blocks[:, 8] > 129).nonzero()[0].max())
+    player = arcade.SpriteSolidColor(16, 36, arcade.color.RED)
+    player.position = (chunk.x + 8) * config.SPRITE_PIXEL_SIZE, (surface + 2) * config.SPRITE_PIXEL_SIZE
+    engine = arcade.PhysicsEnginePlatformer(player, walls=walls, gravity_constant=config.GRAVITY)
+
+    start = perf_counter()
+    for step in range(steps):
+        # Walk back and forth so the player keeps hitting blocks
+        player.change_x = config.MOVEMENT_SPEED if step // 60 % 2 else -config.MOVEMENT_SPEED
+        engine.update()
+    return (perf_counter() - start) / steps * 1e6
+
+
+def main(count: int = 8, steps: int = 600):
+    generated = generate_chunks(-count * 8, count * 8)
+    link_neighbours(generated)
+    chunks = list(generated.values())
+    for chunk in chunks:
+        for _ in chunk.make_sprite_list():
+            pass
+
+    rows = [["walls", "sprites", "step us"]]
+    for layer in ("whole chunks", "solid sections", "exposed sections"):
+        walls = _walls(chunks, layer)
+        rows.append([layer, sum(map(len, walls)), f"{_step_us(chunks, walls, steps):.1f}"])
+    report(f"{len(chunks)} chunks, {steps} physics steps", rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
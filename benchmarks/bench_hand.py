@@ -0,0 +1,86 @@
+"""
+Per-frame cost of keeping the held item in the player sprite list: a new
+sprite from the PNG path every frame as before, against the cached hand
+sprite. Counts bytes allocated (tracemalloc) and texture loads per frame.
+
+    python benchmarks/bench_hand.py [frames]
+"""
+import sys
+import tracemalloc
+from time import perf_counter
+
+import arcade
+from common import config, report
+
+from entities.player import Player, PlayerSpriteList
+from misc.item import Item
+
+
+def legacy_update_list(sprite_list: PlayerSpriteList):
+    """``update_list`` as it was, with the hand rebuilt from its PNG path"""
+    if len(sprite_list) != 1:
+        sprite_list.pop()
+    player = sprite_list.player
+    item = player.inventory.slots[player.inventory.selected_slot]
+    if not item:
+        return
+    sprite_list.append(arcade.Sprite(
+        config.ASSET_DIR / "sprites" / f"{item.block_id}.png",
+        scale=1 / (2 * config.SPRITE_PIXEL_SIZE),
+        center_x=player.center_x - 8,
+        center_y=player.center_y - 8,
+    ))
+
+
+class _CountLoads:
+    """Count calls to ``load_texture`` made through the sprite module"""
+
+    def __init__(self):
+        self.module = sys.modules[arcade.Sprite.__module__]
+        if not hasattr(self.module, "load_texture"):
+            self.module = arcade
+        self.original = self.module.load_texture
+        self.calls = 0
+
+    def __enter__(self):
+        def load_texture(*args, **kwargs):
+            self.calls += 1
+            return self.original(*args, **kwargs)
+        self.module.load_texture = load_texture
+        return self
+
+    def __exit__(self, *_):
+        self.module.load_texture = self.original
+
+
+def _measure(update, frames: int):
+    player = Player(
+        "player", scale=1, center_x=0, center_y=0, screen_width=800, screen_height=600,
+        movement_speed=5, jump_speed=24, flipped_horizontally=False,
+    )
+    player.inventory.add(Item(True, 130))
+    sprite_list = PlayerSpriteList(player)
+    update(sprite_list)
+
+    with _CountLoads() as loads:
+        tracemalloc.start()
+        start = perf_counter()
+        for frame in range(frames):
+            player.center_x = frame
+            update(sprite_list)
+        seconds = perf_counter() - start
+        allocated = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return seconds, allocated, loads.calls
+
+
+def main(frames: int = 1000):
+    rows = [["", "us/frame", "peak bytes", "loads/frame"]]
+    for name, update in (("rebuilt", legacy_update_list), ("cached", PlayerSpriteList.update_list)):
+        seconds, allocated, loads = _measure(update, frames)
+        rows.append([name, f"{seconds / frames * 1e6:.1f}", allocated, f"{loads / frames:.2f}"])
+    report(f"{frames} frames holding one item", rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
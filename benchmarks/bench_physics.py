@@ -0,0 +1,71 @@
+"""
+Physics step time for many bodies walking and jumping over generated
+terrain, with the sprite based platformer engine against the tile grid
+resolver. Runs headless, the bodies are never drawn.
+
+    python benchmarks/bench_physics.py [bodies] [steps]
+"""
+import sys
+from time import perf_counter
+
+import arcade
+import numpy as np
+from common import config, generate_chunks, link_neighbours, report
+
+from misc.physics import TileGridPhysics
+
+CHUNKS = 8
+
+
+def _bodies(chunks, count: int):
+    """Bodies standing on the surface, spread over the chunks"""
+    rng = np.random.default_rng(0)
+    bodies = []
+    for cell_x in rng.integers(CHUNKS * config.CHUNK_WIDTH, size=count).tolist():
+        chunk = chunks[cell_x // config.CHUNK_WIDTH]
+        surface = int((chunk.blocks[:, cell_x % config.CHUNK_WIDTH] > 129).nonzero()[0].max())
+        body = arcade.SpriteSolidColor(16, 36, arcade.color.RED)
+        body.position = cell_x * config.SPRITE_PIXEL_SIZE, (surface + 2) * config.SPRITE_PIXEL_SIZE
+        bodies.append(body)
+    return bodies
+
+
+def _step_us(engines, steps: int) -> float:
+    start = perf_counter()
+    for step in range(steps):
+        for n, engine in enumerate(engines):
+            body = engine.player_sprite
+            # Walk back and forth, jumping now and then
+            body.change_x = config.MOVEMENT_SPEED if (step + n) // 60 % 2 else -config.MOVEMENT_SPEED
+            if (step + n) % 45 == 0 and engine.can_jump():
+                body.change_y = config.JUMP_SPEED
+            engine.update()
+    return (perf_counter() - start) / steps * 1e6
+
+
+def main(count: int = 200, steps: int = 300):
+    chunks = {chunk.index: chunk for chunk in generate_chunks(0, CHUNKS * config.CHUNK_WIDTH).values()}
+    link_neighbours(chunks)
+    rows = [["engine", "us/step", "us/body"]]
+
+    for chunk in chunks.values():
+        for _ in chunk.make_sprite_list():
+            pass
+    # The exposed-surface collision layer of every chunk
+    walls = [sprites for chunk in chunks.values() for sprites in chunk._walls.values()]
+    engines = [
+        arcade.PhysicsEnginePlatformer(body, walls=walls, gravity_constant=config.GRAVITY)
+        for body in _bodies(chunks, count)
+    ]
+    step_us = _step_us(engines, steps)
+    rows.append(["platformer", f"{step_us:.0f}", f"{step_us / count:.1f}"])
+
+    engines = [TileGridPhysics(body, chunks.get, gravity_constant=config.GRAVITY) for body in _bodies(chunks, count)]
+    step_us = _step_us(engines, steps)
+    rows.append(["tile grid", f"{step_us:.0f}", f"{step_us / count:.1f}"])
+
+    report(f"{count} bodies over {CHUNKS} chunks, {steps} steps", rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,80 @@
+"""
+Chunk loading from the region file against the old storage, one gzip
+pickled ``(x, y) -> block_id`` dict per chunk.
+
+Cold loads drop the OS page cache first (Linux only) and open the storage
+fresh, warm loads reuse open storage with the data already cached.
+
+    python benchmarks/bench_region.py
+"""
+import gzip
+import pickle
+import tempfile
+from pathlib import Path
+
+from common import (HorizontalChunk, drop_page_cache, generate_chunks, report,
+                    timed,)
+
+from misc.region import RegionFile
+
+
+def save_per_file(chunks, directory: Path) -> None:
+    for n, chunk in chunks.items():
+        with gzip.open(directory / f"pickle{pickle.format_version}_{n}.pickle", "wb") as fd:
+            pickle.dump(dict(chunk.data), fd)
+
+
+def load_per_file(directory: Path, indices) -> None:
+    for n in indices:
+        with gzip.open(directory / f"pickle{pickle.format_version}_{n}.pickle") as f:
+            pickle.load(f)
+
+
+def save_region(chunks, path: Path) -> None:
+    region = RegionFile(path)
+    region.write_many((n, chunk.encode()) for n, chunk in chunks.items())
+    region.close()
+
+
+def load_region(region: RegionFile, indices) -> None:
+    for n in indices:
+        HorizontalChunk.decode(n, region.read(n))
+
+
+def main():
+    chunks = generate_chunks()
+    indices = sorted(chunks)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        per_file_dir = Path(tmp) / "pickles"
+        per_file_dir.mkdir()
+        region_path = Path(tmp) / "world.region"
+
+        save_per_file_s = timed(save_per_file, chunks, per_file_dir)
+        save_region_s = timed(save_region, chunks, region_path)
+        per_file_bytes = sum(p.stat().st_size for p in per_file_dir.iterdir())
+
+        for path in per_file_dir.iterdir():
+            drop_page_cache(path)
+        cold_per_file_s = timed(load_per_file, per_file_dir, indices)
+        warm_per_file_s = timed(load_per_file, per_file_dir, indices)
+
+        drop_page_cache(region_path)
+        region = RegionFile(region_path)
+        cold_region_s = timed(load_region, region, indices)
+        warm_region_s = timed(load_region, region, indices)
+        region_bytes = region.size
+        region.close()
+
+    per_chunk = 1000 / len(indices)
+    report(f"{len(indices)} chunks", [
+        ["", "save s", "bytes", "cold ms/chunk", "warm ms/chunk"],
+        ["per-file gzip", f"{save_per_file_s:.3f}", per_file_bytes,
+         f"{cold_per_file_s * per_chunk:.3f}", f"{warm_per_file_s * per_chunk:.3f}"],
+        ["region file", f"{save_region_s:.3f}", region_bytes,
+         f"{cold_region_s * per_chunk:.3f}", f"{warm_region_s * per_chunk:.3f}"],
+    ])
+
+
+if __name__ == "__main__":
+    main()
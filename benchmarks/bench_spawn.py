@@ -0,0 +1,74 @@
+"""
+Loading the spawn area: one chunk requested after the other as the
+loading screen did, against every spawn chunk requested at once and
+spread over the loader threads. Results are collected once per 60 Hz
+frame like the loading screen does. Blocks only, the sprites need a
+window. Measured for chunks stored in the region file and for chunks
+generated on first visit.
+
+    python benchmarks/bench_spawn.py [runs]
+"""
+import sys
+import tempfile
+from pathlib import Path
+from statistics import median
+from time import perf_counter, sleep
+
+from common import config, report
+
+from misc.region import RegionFile
+from world import ChunkLoader
+
+SEED = 1
+# Chunks World.spawn_chunks picks around the default spawn
+SPAWN = list(range(-3, 5))
+FRAME = 1 / 60
+
+
+def _wait_frames(loader: ChunkLoader, count: int):
+    """Sleep a frame at a time until count loads are done"""
+    while loader.queue_out.qsize() < count:
+        sleep(FRAME)
+    for _ in range(count):
+        loader.queue_out.get()
+
+
+def one_by_one(loader: ChunkLoader) -> float:
+    start = perf_counter()
+    for chunk_id in SPAWN:
+        loader.request(chunk_id, priority=0)
+        _wait_frames(loader, 1)
+    return perf_counter() - start
+
+
+def all_at_once(loader: ChunkLoader) -> float:
+    start = perf_counter()
+    for chunk_id in SPAWN:
+        loader.request(chunk_id, priority=abs(chunk_id))
+    _wait_frames(loader, len(SPAWN))
+    return perf_counter() - start
+
+
+def _measure(load, stored: bool, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        region = RegionFile(Path(tempfile.mkdtemp()) / "bench.region")
+        loader = ChunkLoader(region, SEED, workers=config.CHUNK_LOADER_WORKERS)
+        if stored:
+            for chunk_id in SPAWN:
+                region.write(chunk_id, loader._load(chunk_id).encode())
+        loader.start()
+        samples.append(load(loader))
+        region.close()
+    return median(samples)
+
+
+def main(runs: int = 3):
+    rows = [["", "stored ms", "generated ms"]]
+    for name, load in (("one by one", one_by_one), ("all at once", all_at_once)):
+        rows.append([name, *(f"{_measure(load, stored, runs) * 1e3:.1f}" for stored in (True, False))])
+    report(f"{len(SPAWN)} spawn chunks, {config.CHUNK_LOADER_WORKERS} loader threads, median of {runs}", rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
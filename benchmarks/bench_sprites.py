@@ -0,0 +1,58 @@
+"""
+Sprites per chunk, sprite creation time and draw time with and without
+sprites for sky and cloud cells. Needs an OpenGL context, the window is
+kept hidden.
+
+    python benchmarks/bench_sprites.py [chunks] [draws]
+"""
+import sys
+from statistics import median
+from time import perf_counter
+
+import arcade
+from common import config, generate_chunks, report
+
+from misc.chunk import HorizontalChunk
+
+
+def _draw_ms(window: arcade.Window, chunks, draws: int) -> float:
+    samples = []
+    for _ in range(draws):
+        window.clear()
+        start = perf_counter()
+        for chunk in chunks:
+            chunk.draw()
+        window.ctx.finish()
+        samples.append(perf_counter() - start)
+    return median(samples) / len(chunks) * 1e3
+
+
+def main(count: int = 8, draws: int = 100):
+    window = arcade.Window(config.SCREEN_WIDTH, config.SCREEN_HEIGHT, visible=False)
+    source = list(generate_chunks(-count * 8, count * 8).values())
+
+    rows = [["sky sprites", "sprites/chunk", "make ms/chunk", "draw ms/chunk"]]
+    for sky_sprites in (True, False):
+        config.SKY_SPRITES = sky_sprites
+        chunks = [HorizontalChunk(chunk.x, chunk.index, chunk.blocks.copy()) for chunk in source]
+
+        start = perf_counter()
+        for chunk in chunks:
+            for _ in chunk.make_sprite_list():
+                pass
+        make_s = perf_counter() - start
+
+        # The first draw uploads the sprites and bakes the clouds
+        _draw_ms(window, chunks, 1)
+        rows.append([
+            sky_sprites,
+            sum(chunk.sprite_count for chunk in chunks) // len(chunks),
+            f"{make_s / len(chunks) * 1e3:.2f}",
+            f"{_draw_ms(window, chunks, draws):.3f}",
+        ])
+    window.close()
+    report(f"{len(source)} chunks, median of {draws} draws", rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
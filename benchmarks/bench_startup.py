@@ -0,0 +1,32 @@
+"""
+Cold start: seconds for a fresh interpreter to import what the menu needs
+(``game``) against everything the game view needs (``world``, which loads
+numpy, the terrain generator and the textures). Each import runs in a new
+process so nothing is cached between runs.
+
+    python benchmarks/bench_startup.py [runs]
+"""
+import subprocess
+import sys
+from statistics import median
+
+from common import SRC_DIR, report, timed
+
+
+def _run(module: str):
+    subprocess.run([sys.executable, "-c", f"import {module}"], cwd=SRC_DIR, check=True)
+
+
+def _cold_import(module: str) -> float:
+    return timed(_run, module)
+
+
+def main(runs: int = 5):
+    rows = [["import", "ms"]]
+    for module in ("game", "world", "game, world"):
+        rows.append([module, f"{median(_cold_import(module) for _ in range(runs)) * 1e3:.1f}"])
+    report(f"Cold imports, median of {runs} processes", rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
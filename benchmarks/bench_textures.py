@@ -0,0 +1,113 @@
+"""
+Startup texture loading: one ``load_texture`` per PNG as before, against
+cutting every texture from the prebaked atlas. Then the texture binds of
+one frame of chunks, counted on the GL texture while the chunks draw, next
+to an estimate for drawing sprite by sprite, which would bind once per
+change of source image. Needs an OpenGL context for the second part, the
+window is kept hidden.
+
+    python benchmarks/bench_textures.py [repeats] [chunks]
+"""
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from statistics import median
+from typing import Iterator, List
+
+import arcade
+from common import config, generate_chunks, report, timed
+
+from misc import atlas
+
+
+def _clear_texture_cache():
+    """Forget loaded textures so every run reads the files again"""
+    cleanup = getattr(arcade, "cleanup_texture_cache", None)
+    if cleanup is not None:
+        cleanup()
+        return
+    cache = getattr(arcade.texture, "default_texture_cache", None)
+    if cache is not None:
+        cache.flush()
+
+
+@contextmanager
+def _count_binds() -> Iterator[List[int]]:
+    """Count every GL texture bind made inside the block"""
+    # Named Texture2D from arcade 3.0 on
+    texture_class = getattr(arcade.gl, "Texture2D", None) or arcade.gl.Texture
+    use = texture_class.use
+    count = [0]
+
+    def counted(texture, *args, **kwargs):
+        count[0] += 1
+        return use(texture, *args, **kwargs)
+
+    texture_class.use = counted
+    try:
+        yield count
+    finally:
+        texture_class.use = use
+
+
+def legacy_load():
+    """Textures as ``block.block`` loaded them, one file at a time"""
+    _clear_texture_cache()
+    for path in (config.ASSET_DIR / "animations").iterdir():
+        arcade.load_texture(path)
+    for block_id in range(128, 156):
+        arcade.load_texture(config.ASSET_DIR / "sprites" / f"{block_id}.png")
+
+
+def startup(repeats: int):
+    build_dir = Path(tempfile.mkdtemp())
+    image_path, index_path = build_dir / "atlas.png", build_dir / "atlas.json"
+    build = timed(atlas.build_atlas, config.ASSET_DIR, image_path, index_path)
+
+    files = len(list((config.ASSET_DIR / "animations").iterdir())) + 28
+    rows = [["", "ms", "files read"]]
+    per_file = median(timed(legacy_load) for _ in range(repeats))
+    atlas_load = median(timed(atlas.load_atlas, config.ASSET_DIR, image_path, index_path) for _ in range(repeats))
+    rows.append(["per file", f"{per_file * 1e3:.2f}", files])
+    rows.append(["atlas", f"{atlas_load * 1e3:.2f}", 2])
+    rows.append(["atlas build", f"{build * 1e3:.2f}", len(atlas.sources())])
+    report(f"Startup texture load, median of {repeats}", rows)
+
+
+def binds(count: int):
+    window = arcade.Window(config.SCREEN_WIDTH, config.SCREEN_HEIGHT, visible=False)
+    chunks = list(generate_chunks(-count * 8, count * 8).values())
+    for chunk in chunks:
+        for _ in chunk.make_sprite_list():
+            pass
+
+    window.clear()
+    with _count_binds() as bound:
+        for chunk in chunks:
+            chunk.draw()
+    sprite_lists = [
+        sprite_list for chunk in chunks for sprite_list in (*chunk._blocks.values(), *chunk._bg_blocks.values())
+    ]
+    # Not drawn, a bind on every change of texture between consecutive sprites
+    per_sprite = sum(
+        1 + sum(a.texture is not b.texture for a, b in zip(sprite_list, sprite_list[1:]))
+        for sprite_list in sprite_lists
+    )
+    images = {id(sprite.texture.image) for sprite_list in sprite_lists for sprite in sprite_list}
+    atlases = {id(sprite_list.atlas) for sprite_list in sprite_lists}
+
+    rows = [["", "binds/frame"]]
+    rows.append(["per sprite (estimate)", per_sprite])
+    rows.append([f"{len(sprite_lists)} sprite lists", bound[0]])
+    report(f"{count} chunks, {len(images)} source images, {len(atlases)} GPU atlas", rows)
+    window.close()
+
+
+def main(repeats: int = 10, count: int = 8):
+    startup(repeats)
+    binds(count)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,42 @@
+"""
+World generation time against the number of worker processes.
+
+    python benchmarks/bench_worldgen.py [max workers] [world half width]
+"""
+import os
+import sys
+from time import perf_counter
+
+from common import config, report
+
+from misc.terrain import gen_world, gen_world_parallel
+
+SEED = 1234
+
+
+def main(max_workers: int = os.cpu_count() or 1, half_width: int = 496):
+    y_min, y_max = config.HEIGHT_MIN, config.HEIGHT_MIN + 320
+
+    start = perf_counter()
+    gen_world(-half_width, half_width, y_min, y_max, seed=SEED)
+    serial_s = perf_counter() - start
+
+    rows = [["workers", "seconds", "speedup"], ["gen_world", f"{serial_s:.3f}", "1.00"]]
+    reference = None
+    for workers in sorted({1, 2, 4, 8, max_workers}):
+        if workers > max_workers:
+            continue
+        start = perf_counter()
+        world = gen_world_parallel(-half_width, half_width, y_min, y_max, seed=SEED, workers=workers)
+        seconds = perf_counter() - start
+        rows.append([workers, f"{seconds:.3f}", f"{serial_s / seconds:.2f}"])
+
+        # The same seed must give the same world whatever the worker count
+        reference = reference or world
+        assert all((world[n] == reference[n]).all() for n in reference)
+
+    report(f"{2 * half_width // 16} columns", rows)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,55 @@
+"""Helpers shared by the benchmarks. Importing this puts ``src`` on the path."""
+import os
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, List
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+import config  # noqa: E402
+from misc.chunk import HorizontalChunk  # noqa: E402
+from misc.terrain import gen_world  # noqa: E402
+
+
+def generate_chunks(x_min: int = -496, x_max: int = 496) -> Dict[int, HorizontalChunk]:
+    """Generate a world the same way ``World.setup_world`` does"""
+    chunks = {n: HorizontalChunk(n * 16, n) for n in range(x_min // 16, x_max // 16)}
+    for k, chunk_data in gen_world(x_min, x_max, config.HEIGHT_MIN, config.HEIGHT_MIN + 320).items():
+        chunks[int(k[1] / 16)]['setter'] = chunk_data
+    return chunks
+
+
+def link_neighbours(chunks: Dict[int, HorizontalChunk]) -> None:
+    """Hand every chunk the edge columns of the chunks beside it, as ``World`` does when they load"""
+    for index, chunk in chunks.items():
+        for side in (-1, 1):
+            neighbour = chunks.get(index + side)
+            if neighbour is not None:
+                chunk.set_neighbour_edge(side, neighbour.edge(-side))
+
+
+def drop_page_cache(path: Path) -> None:
+    """Ask the OS to forget cached pages of a file, where supported"""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def timed(func: Callable, *args) -> float:
+    """Seconds taken by one call"""
+    start = perf_counter()
+    func(*args)
+    return perf_counter() - start
+
+
+def report(title: str, rows: List[List]) -> None:
+    print(f"\n{title}")
+    for row in rows:
+        print("  " + "".join(f"{str(cell):>16}" for cell in row))
@@ -0,0 +1,240 @@
+"""
+Headless benchmark suite covering world generation, saving, chunk loading,
+sprite creation and a scripted walk across the world. Results are written
+as JSON so runs on different branches can be compared.
+
+    python benchmarks/run.py [--output results.json] [--quick]
+    python benchmarks/run.py --compare before.json after.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from time import perf_counter
+from typing import Dict
+
+from common import HorizontalChunk, config, drop_page_cache
+
+from misc.cache import ChunkCache
+from misc.region import RegionFile
+from misc.terrain import gen_world, gen_world_parallel
+from utils import percentiles
+from world import ChunkLoader
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+SEED = 1234
+Y_RANGE = (config.HEIGHT_MIN, config.HEIGHT_MIN + config.CHUNK_HEIGHT)
+
+
+def bench_gen_world(half_width: int) -> Dict[str, float]:
+    start = perf_counter()
+    gen_world(-half_width, half_width, *Y_RANGE, seed=SEED)
+    serial_s = perf_counter() - start
+
+    start = perf_counter()
+    gen_world_parallel(-half_width, half_width, *Y_RANGE, seed=SEED, workers=config.WORLD_GEN_WORKERS)
+    parallel_s = perf_counter() - start
+    return {"chunks": 2 * half_width // config.CHUNK_WIDTH, "serial_s": serial_s, "parallel_s": parallel_s}
+
+
+def bench_save(half_width: int, path: Path) -> Dict[str, float]:
+    """Generate and write a world the way ``World.setup_world`` does"""
+    world = gen_world_parallel(-half_width, half_width, *Y_RANGE, seed=SEED, workers=config.WORLD_GEN_WORKERS)
+    start = perf_counter()
+    region = RegionFile(path)
+    region.write_many((n, HorizontalChunk(n * 16, n, blocks).encode()) for n, blocks in world.items())
+    save_s = perf_counter() - start
+    size = region.size
+    region.close()
+    return {"chunks": len(world), "save_s": save_s, "bytes": size, "bytes_per_chunk": size / len(world)}
+
+
+def bench_load(path: Path) -> Dict[str, float]:
+    """Load every saved chunk through the chunk loader, with a cold page cache where possible"""
+    drop_page_cache(path)
+    region = RegionFile(path)
+    indices = region.indices
+    loader = ChunkLoader(region, SEED, workers=config.CHUNK_LOADER_WORKERS)
+
+    start = perf_counter()
+    loader.start()
+    for n in indices:
+        loader.request(n, priority=abs(n))
+    finished = 0
+    while finished < len(indices):
+        finished += len(loader.get_loaded_chunks(max_results=None))
+        time.sleep(0.001)
+    seconds = perf_counter() - start
+
+    stats = loader.stats
+    region.close()
+    return {
+        "chunks": stats["loaded"],
+        "failed": stats["failed"],
+        "chunks_per_s": stats["loaded"] / seconds,
+        **{k: v for k, v in stats.items() if k.startswith(("load_", "queue_wait_"))},
+    }
+
+
+def bench_make_sprite_list(path: Path, count: int) -> Dict[str, float]:
+    region = RegionFile(path)
+    samples = []
+    for n in region.indices[:count]:
+        chunk = HorizontalChunk.decode(n, region.read(n))
+        start = perf_counter()
+        for _ in chunk.make_sprite_list():
+            pass
+        samples.append(perf_counter() - start)
+    region.close()
+    return {
+        "chunks": len(samples),
+        "mean_ms": statistics.mean(samples) * 1000,
+        **{f"{k}_ms": v * 1000 for k, v in percentiles(samples).items()},
+    }
+
+
+def bench_traversal(path: Path, chunks: int) -> Dict[str, float]:
+    """
+    Walk right across ``chunks`` chunks and back at walking speed, keeping the
+    visible range loaded the way ``World`` does, one 60 fps frame at a time
+    """
+    region = RegionFile(path)
+    loader = ChunkLoader(region, SEED, workers=config.CHUNK_LOADER_WORKERS)
+    loader.start()
+    cache = ChunkCache(config.CHUNK_CACHE_SPRITES, config.CHUNK_CACHE_SIZE, flush=lambda _: None)
+    reach = config.VISIBLE_RANGE_MAX // config.CHUNK_WIDTH + 1
+    requested = set()
+    ready = set()  # Visible chunks already counted
+    failed = set()  # Chunks that could not be loaded, skipped from then on
+    requests = loads = stalled = 0
+
+    end_x = chunks * config.CHUNK_WIDTH_PIXELS
+    path_x = [x for x in range(0, end_x, int(config.MOVEMENT_SPEED))]
+    path_x += path_x[::-1]
+
+    start = perf_counter()
+    frame = 0
+    while frame < len(path_x):
+        center = int((path_x[frame] + config.SPRITE_PIXEL_SIZE / 2) // config.CHUNK_WIDTH_PIXELS)
+        visible = set(range(center - reach, center + reach + 1))
+
+        for result in loader.get_loaded_chunks(max_results=None):
+            chunk = result.chunk
+            if chunk is None:
+                failed.add(result.chunk_id)
+                continue
+            for _ in chunk.make_sprite_list():
+                pass
+            cache[chunk.index] = chunk
+            requested.discard(chunk.index)
+            loads += 1
+
+        # Poll with peek, counting a hit, rebuild or miss once per chunk as it is needed
+        ready &= visible
+        missing = False
+        for index in sorted(visible - failed, key=lambda i: abs(i - center)):
+            chunk = cache.peek(index)
+            if chunk is not None and chunk.has_sprites:
+                if index not in ready:
+                    cache.get(index)
+                    ready.add(index)
+            elif chunk is not None:
+                cache.get(index)
+                for _ in chunk.make_sprite_list():
+                    pass
+                ready.add(index)
+            else:
+                missing = True
+                if index not in requested:
+                    cache.get(index)
+                    requested.add(index)
+                    requests += 1
+                    loader.request(index, priority=abs(index - center))
+        cache.evict(visible)
+
+        # The player waits while a visible chunk is missing
+        if missing:
+            stalled += 1
+            time.sleep(1 / 60)
+        else:
+            frame += 1
+    seconds = perf_counter() - start
+    region.close()
+    return {
+        "frames": len(path_x),
+        "stalled_frames": stalled,
+        "seconds": seconds,
+        "requests": requests,
+        "loads": loads,
+        "failures": len(failed),
+        **cache.stats,
+    }
+
+
+def run(quick: bool) -> Dict[str, Dict[str, float]]:
+    half_width = 8 * config.CHUNK_WIDTH if quick else 31 * config.CHUNK_WIDTH
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "world.region"
+        results["gen_world"] = bench_gen_world(half_width)
+        results["save"] = bench_save(half_width, path)
+        results["load"] = bench_load(path)
+        results["make_sprite_list"] = bench_make_sprite_list(path, 4 if quick else 16)
+        results["traversal"] = bench_traversal(path, 8 if quick else 48)
+    return results
+
+
+def _revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(before_path: Path, after_path: Path):
+    before = json.loads(before_path.read_text())["results"]
+    after = json.loads(after_path.read_text())["results"]
+    print(f"{'metric':<40}{'before':>14}{'after':>14}{'change':>10}")
+    for group, metrics in after.items():
+        for name, value in metrics.items():
+            old = before.get(group, {}).get(name)
+            change = f"{(value - old) / old * 100:+.1f}%" if old else ""
+            old = f"{old:.4g}" if old is not None else "-"
+            print(f"{group + '.' + name:<40}{old:>14}{value:>14.4g}{change:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, help="JSON file to write, results/<time>-<revision>.json by default")
+    parser.add_argument("--quick", action="store_true", help="Smaller world and shorter walk")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("BEFORE", "AFTER"), help="Compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    revision = _revision()
+    results = run(args.quick)
+    output = args.output or RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{revision}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "revision": revision,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "quick": args.quick,
+        "results": results,
+    }, indent=2))
+
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
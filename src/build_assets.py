@@ -0,0 +1,10 @@
+"""
+Pack every texture into the atlas the game loads at startup. Run it after
+adding or changing a texture and commit the atlas with it.
+
+    python src/build_assets.py
+"""
+from misc.atlas import build_atlas
+
+if __name__ == "__main__":
+    build_atlas()
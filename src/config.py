@@ -2,6 +2,9 @@ from pathlib import Path
 
 ASSET_DIR = (Path(__file__).parent.parent / "assets").resolve()
 DATA_DIR = (Path(__file__).parent.parent / "data").resolve()
+# Every texture packed into one image, built from ASSET_DIR by build_assets.py
+ATLAS_IMAGE = ASSET_DIR / "atlas.png"
+ATLAS_INDEX = ASSET_DIR / "atlas.json"
 
 MAX_SLOTS = 10
 
@@ -37,6 +40,38 @@ VISIBLE_RANGE_MIN = int((-2.5 * CHUNK_WIDTH) / SPRITE_SCALING)
 CHUNK_WIDTH_PIXELS = SPRITE_PIXEL_SIZE * CHUNK_WIDTH
 CHUNK_HEIGHT_PIXELS = SPRITE_PIXEL_SIZE * CHUNK_HEIGHT
 
+# Chunks are drawn and collided in vertical sections of this many rows
+SECTION_HEIGHT = 16
+SECTION_HEIGHT_PIXELS = SPRITE_PIXEL_SIZE * SECTION_HEIGHT
+SECTION_MARGIN = 1  # Sections drawn beyond the camera viewport on each side
+PHYSICS_SECTION_MARGIN = 1  # Sections above and below the player's handed to the physics engine
+TILE_PHYSICS = False  # Collide the player with the block arrays instead of sprite lists
+
 HEIGHT_MIN = 0
 
+SAVE_INTERVAL = 5.0  # Seconds between writes of edited chunks
+
+WORLD_SEED = None  # None picks a random world
+WORLD_GEN_WORKERS = None  # Processes generating the world, None for one per core
+WORLD_GEN_PARALLEL_COLUMNS = 32  # Fewer columns are generated in-process unless workers are given, a pool costs more
+CHUNK_CACHE_SPRITES = 12  # Chunks that keep their sprites, including the visible ones
+CHUNK_CACHE_SIZE = 64  # Chunks kept in memory at all
+CHUNK_LOADER_WORKERS = 2  # Threads loading chunks
+CHUNK_LOADER_SAMPLES = 256  # Recent loads kept for the loader's latency percentiles
+CHUNK_CANCEL_DISTANCE = 4  # Queued chunk requests further than this from the player are cancelled
+CHUNK_LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)  # Milliseconds, loader histogram bounds
+CHUNK_THROUGHPUT_WINDOW = 5.0  # Seconds of loads the loader throughput is measured over
+CHUNK_RETRY_DELAY = 1.0  # Seconds before a chunk that failed to load is requested again
+CHUNK_INTEGRATION_BUDGET = 0.002  # Seconds per frame spent making sprites for loaded chunks
+LOADING_INTEGRATION_BUDGET = 0.012  # The same on the loading screen, where frame rate matters less
+SKY_SPRITES = False  # Make sprites for sky and cloud cells instead of drawing them as background
+SKY_COLOR = (10, 225, 235)  # Average colour of the sky block texture
+CLOUD_COLOR = (205, 205, 205)  # Average colour of the cloud block texture
+SPAWN_CHUNKS = 3  # Chunks on each side of the spawn generated with a new world
+BIOME_COLUMNS = 16  # Width of a biome in chunks
+
+PROFILER_ENABLED = True  # Time each phase of every frame, F3 shows the timings and F4 writes them to DATA_DIR
+PROFILER_SAMPLES = 600  # Frames kept per phase
+STARTUP_PROFILE = False  # Report import and asset times once the menu is up, also set by --profile-startup
+
 DEFAULT_PLAYER_HEALTH = 100
@@ -1,4 +1,4 @@
-from arcade import Sprite
+from arcade import Sprite, Texture
 
 from config import DEFAULT_PLAYER_HEALTH
 
@@ -8,7 +8,7 @@ class Entity(Sprite):
 
     def __init__(
             self,
-            image_file: str,
+            texture: Texture,
             scale: float,
             center_x: float,
             center_y: float,
@@ -16,8 +16,8 @@ class Entity(Sprite):
     ) -> None:
         """Initialize the Entity
 
-        :param image_file: Path to the image file.
-        :type image_file: str
+        :param texture: Texture of the sprite.
+        :type texture: Texture
         :param scale: Scale of the sprite.
         :type scale: float
         :param center_x: Entity's x coordinate.
@@ -26,7 +26,7 @@ class Entity(Sprite):
         :type center_y: float
         """
         super().__init__(
-            image_file,
+            texture,
             scale=scale,
             center_x=center_x,
             center_y=center_y,
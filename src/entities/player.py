@@ -1,14 +1,16 @@
 import math
 from abc import ABC
 from enum import Enum
-from typing import Optional
+from typing import Optional, Tuple
 
 import arcade
-from arcade import key, load_texture_pair
+from arcade import key
 
 import config
+from block.block import TEXTURES
 from entities.entity import Entity
 from misc.inventory import Inventory
+from misc.item import hand_sprite
 
 
 class Direction(Enum):
@@ -32,7 +34,7 @@ class Player(Entity):
     ) -> None:
         """Initialize the Player.
 
-        :param image_file: Path to the image file.
+        :param image_file: Name of the texture in the atlas' mobs directory.
         :type image_file: str
         :param scale: Scale of the sprite.
         :type scale: float
@@ -51,8 +53,9 @@ class Player(Entity):
         :param flipped_horizontally: Should the player sprite be flipped.
         :type flipped_horizontally: bool
         """
+        texture = TEXTURES[f"mobs/{image_file}.png"]
         super().__init__(
-            config.ASSET_DIR / "mobs" / f"{image_file}.png",
+            texture,
             scale * 5 / 2,
             center_x, center_y,
             flipped_horizontally,
@@ -63,13 +66,14 @@ class Player(Entity):
         self.jump_speed = jump_speed
         self.direction: Optional[Direction] = None
         self.last_faced_dir = "left"
-        self.textures = []
-        self.textures.extend(load_texture_pair(config.ASSET_DIR / "mobs" / f"{image_file}.png"))
-        self._physics_engine: arcade.PhysicsEnginePlatformer = None
+        # Facing left, then mirrored to face right
+        self.textures = [texture, texture.flip_left_right()]
+        # arcade.PhysicsEnginePlatformer or misc.physics.TileGridPhysics
+        self._physics_engine = None
         self.inventory = Inventory()
 
     @property
-    def physics_engine(self) -> arcade.PhysicsEnginePlatformer:
+    def physics_engine(self):
         return self._physics_engine
 
     @physics_engine.setter
@@ -119,7 +123,12 @@ class Player(Entity):
 
     @property
     def hand(self) -> Optional[arcade.Sprite]:
-        return self.inventory.get_selected_item(self.center_x - 8, self.center_y - 8)
+        return self.inventory.get_selected_item(*self.hand_position)
+
+    @property
+    def hand_position(self) -> Tuple[float, float]:
+        """Where the held item is drawn"""
+        return self.center_x - 8, self.center_y - 8
 
     @property
     def eyes(self) -> int:
@@ -132,14 +141,21 @@ class PlayerSpriteList(arcade.SpriteList, ABC):
         super(PlayerSpriteList, self).__init__(lazy=True)
         self.player = player
         self.append(player)
+        # Block id of the held item sprite in the list
+        self._hand_id: Optional[int] = None
 
     def update_list(self):
-        if len(self) != 1:
-            self.pop()
-        hand = self.player.hand
-        if not hand:
-            return
-        self.append(hand)
+        """Keep the held item in the list, only changing it when the selected item changes"""
+        block_id = self.player.inventory.selected_block_id
+        if block_id != self._hand_id:
+            if len(self) != 1:
+                self.pop()
+            if block_id is not None:
+                self.append(hand_sprite(block_id))
+            self._hand_id = block_id
+
+        if block_id is not None:
+            self[1].position = self.player.hand_position
 
     def __str__(self):
         if len(self) == 1:
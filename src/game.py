@@ -1,12 +1,32 @@
+import importlib
+import sys
+import threading
+from time import perf_counter
 from typing import Optional, Tuple
 
-import arcade
-import arcade.gui
-from arcade import MOUSE_BUTTON_LEFT, MOUSE_BUTTON_RIGHT, color
-
 import config
-from misc.item import Item
-from world import World
+from misc.startup import STARTUP
+
+# Enabled before anything else is imported, to time every import
+if config.STARTUP_PROFILE or "--profile-startup" in sys.argv:
+    STARTUP.enable()
+
+import arcade  # noqa: E402
+import arcade.gui  # noqa: E402
+from arcade import MOUSE_BUTTON_LEFT, MOUSE_BUTTON_RIGHT, color  # noqa: E402
+
+from misc.profiler import PROFILER  # noqa: E402
+
+
+def preload():
+    """
+    Import the world with numpy, the terrain generator and the block textures
+    while the menu is shown. Game imports them again, which only waits for
+    this to finish if it has not yet.
+    """
+    with STARTUP.asset("preload"):
+        importlib.import_module("world")
+    STARTUP.mark("preloaded")
 
 
 class Game(arcade.View):
@@ -15,6 +35,7 @@ class Game(arcade.View):
     def __init__(self) -> None:
         """Initializer"""
         super().__init__()
+        from world import World
 
         self.bg_music: Optional[arcade.Sound] = None
         self.break_cooldown = False
@@ -26,6 +47,12 @@ class Game(arcade.View):
         self.bx = None
         self.by = None
         self.b_color = color.RED
+        # Last mouse position, picked once per frame
+        self._mouse: Optional[Tuple[float, float]] = None
+        # Frame timing overlay
+        self.show_profiler = False
+        # When Start Game was clicked, cleared once the first frame is drawn
+        self.clicked_at: Optional[float] = None
 
         # TODO: Is this necessary?
         self.world.player.inventory.setup_coords((0, 0))
@@ -39,32 +66,60 @@ class Game(arcade.View):
     def setup(self):
         self.world.create()
 
+    def on_show_view(self):
+        # Without sky sprites the clear colour is the sky
+        arcade.set_background_color(config.SKY_COLOR)
+
     def on_draw(self) -> None:
-        self.clear()
+        with PROFILER.phase("draw"):
+            self.clear()
+
+            self.world.draw()
 
-        self.world.draw()
+            # Draw the block selection
+            with PROFILER.phase("draw_selection"):
+                if self.bx is not None and self.by is not None:
+                    arcade.draw_rectangle_outline(self.bx, self.by, 20, 20, self.b_color, 1)
 
-        # Draw the block selection
-        if self.bx is not None and self.by is not None:
-            arcade.draw_rectangle_outline(self.bx, self.by, 20, 20, self.b_color, 1)
+            self.hud_camera.use()
+            with PROFILER.phase("draw_hud"):
+                self.world.player.inventory.smart_draw()
 
-        self.hud_camera.use()
-        self.world.player.inventory.smart_draw()
+        if self.show_profiler:
+            PROFILER.draw(10, self.window.height - 10)
+
+        if self.clicked_at is not None:
+            STARTUP.mark("playable")
+            print(f"Playable {perf_counter() - self.clicked_at:.2f} seconds after clicking Start Game")
+            self.clicked_at = None
+            if STARTUP.enabled:
+                # Again, now with the playable mark
+                STARTUP.report()
 
     def on_update(self, delta_time: float) -> None:
         """Movement and game logic."""
         # print(delta_time)
-        self.world.update()
-        self.world.player.inventory.update()
-        # We created the window with gc_mode="context_gc" and must
-        # manually garbage collect OpenGL resources (if any)
-        num_deleted = self.window.ctx.gc()
+        PROFILER.record("delta_time", delta_time)
+        with PROFILER.phase("update"):
+            self.world.update()
+            with PROFILER.phase("inventory"):
+                self.world.player.inventory.update()
+            with PROFILER.phase("block_selection"):
+                self.update_block_selection()
+            # We created the window with gc_mode="context_gc" and must
+            # manually garbage collect OpenGL resources (if any)
+            with PROFILER.phase("gc"):
+                num_deleted = self.window.ctx.gc()
         # Notify us when resources are deleted
         if num_deleted:
             print(f"Arcade garbage collector deleted {num_deleted} OpenGL resources")
 
     def on_key_press(self, key: int, modifiers: int) -> None:
         """Called when keyboard is pressed"""
+        if key == arcade.key.F3:
+            self.show_profiler = not self.show_profiler
+        elif key == arcade.key.F4:
+            PROFILER.dump()
         self.world.player.on_key_press(key, modifiers)
         self.world.player.inventory.change_slot_keyboard(key)
 
@@ -73,7 +128,14 @@ class Game(arcade.View):
         self.world.player.on_key_release(key, modifiers)
 
     def on_mouse_motion(self, x, y, dx, dy):
-        world_x, world_y = self.screen_to_world_position(x, y)
+        self._mouse = x, y
+
+    def update_block_selection(self):
+        """Look up the block under the last mouse position"""
+        if self._mouse is None:
+            return
+        world_x, world_y = self.screen_to_world_position(*self._mouse)
+        self._mouse = None
         block = self.world.get_block_at_world_position(world_x, world_y)
 
         # Only show the marker when there is a valid block selection.
@@ -86,6 +148,8 @@ class Game(arcade.View):
             self.b_color = color.RED
 
     def on_mouse_press(self, x: float, y: float, button: int, key_modifiers: int) -> None:
+        from misc.item import Item
+
         player = self.world.player
         world_x, world_y = self.screen_to_world_position(x, y)
         block = self.world.get_block_at_world_position(world_x, world_y)
@@ -93,8 +157,8 @@ class Game(arcade.View):
         if button == MOUSE_BUTTON_LEFT:
             # NOTE: This can be improved later with can_break(block) looking at other game states
             if block and self.world.block_break_check(block, world_x, world_y):
-                self.world.remove_block(block)
-                player.inventory.add(Item(True, block.block_id))
+                if self.world.remove_block(block):
+                    player.inventory.add(Item(True, block.block_id))
         elif button == MOUSE_BUTTON_RIGHT and not self.place_cooldown:
             if block:
                 return
@@ -133,14 +197,20 @@ class QuitButton(arcade.gui.UIFlatButton):
 
 
 class LoadingScreen(arcade.View):
-    def __init__(self):
+    def __init__(self, clicked_at: float):
+        """
+        :param float clicked_at: When Start Game was clicked, to time how long until the game is playable
+        """
         super().__init__()
         self.frames = 0
         self.text = "Loading World"
         self.game_view = None
-        self.angle = 0
         self.frame = 0
         self.done_loading = False
+        self.clicked_at = clicked_at
+        # When the spawn chunks were requested
+        self.preload_started: Optional[float] = None
+        self.progress = 0.0
 
     def on_show(self):
         arcade.set_background_color(color.BLACK)
@@ -148,39 +218,51 @@ class LoadingScreen(arcade.View):
     def on_draw(self):
         self.window.clear()
         # On frame 0 we render the loading screen so this happens instantly
-        # On frame 1 we crate the game object and the loading iterator
+        # On frame 1 we crate the game object and request every spawn chunk
         # From frame 2 we invoke loading steps until done.
         if self.frame > 1:
             # Run until all visible chunks are loaded
-            self.game_view.world.process_new_chunks()
-            self.done_loading, _ = self.game_view.world.update_visible_chunks()
-
-            # Trigger next loading step
-            self.angle += 5
-
+            world = self.game_view.world
+            world.process_new_chunks(budget=config.LOADING_INTEGRATION_BUDGET)
+            self.done_loading, _ = world.update_visible_chunks()
+            self.progress = 1.0 if self.done_loading else world.spawn_progress
+
+        text = f"{self.text} {self.progress:.0%}"
+        if self.preload_started is not None and 0 < self.progress < 1:
+            # Assuming the rest loads as fast as what is done so far
+            elapsed = perf_counter() - self.preload_started
+            text += f"  about {elapsed * (1 - self.progress) / self.progress:.1f}s left"
         arcade.draw_text(
-            self.text,
+            text,
             self.window.width / 2,
             self.window.height / 2 + 30,
             color=color.WHITE,
             anchor_x="center",
         )
-        arcade.draw_rectangle_filled(
-            self.window.width / 2,  # x
-            self.window.height / 2 - 30,  # y
-            50,
-            50,
-            arcade.color.WHITE,
-            self.angle,
+
+        # Progress bar
+        width = 300
+        left = (self.window.width - width) / 2
+        arcade.draw_lrtb_rectangle_outline(
+            left, left + width, self.window.height / 2 - 20, self.window.height / 2 - 40, arcade.color.WHITE,
         )
+        if self.progress > 0:
+            arcade.draw_lrtb_rectangle_filled(
+                left, left + width * self.progress, self.window.height / 2 - 20, self.window.height / 2 - 40,
+                arcade.color.WHITE,
+            )
 
     def on_update(self, delta_time: float):
         if self.frame == 1:
             self.game_view = Game()
             self.game_view.setup()
+            self.game_view.world.preload_spawn()
+            self.preload_started = perf_counter()
 
         # Loading is done. Show the game view (Will happen in next frame)
         if self.done_loading:
+            print(f"Loaded the spawn area in {perf_counter() - self.preload_started:.2f} seconds")
+            self.game_view.clicked_at = self.clicked_at
             self.window.show_view(self.game_view)
 
         self.frame += 1
@@ -241,7 +323,7 @@ class StartView(arcade.View):
         )
 
     def on_click_start(self, _):
-        self.window.show_view(LoadingScreen())
+        self.window.show_view(LoadingScreen(clicked_at=perf_counter()))
 
     def on_draw(self):
         self.window.clear()
@@ -261,6 +343,14 @@ class StartView(arcade.View):
             self.frameNum = 1
 
         self.manager.draw()
+        STARTUP.mark("menu_first_frame")
+
+    def on_update(self, delta_time: float):
+        # Report once the menu is up and everything else has been loaded,
+        # and again once the game is playable
+        if STARTUP.timing_imports and "preloaded" in STARTUP.marks and "menu_first_frame" in STARTUP.marks:
+            STARTUP.stop_imports()
+            STARTUP.report()
 
     def on_hide_view(self):
         # Disable the UIManager when the view is hidden.
@@ -278,9 +368,15 @@ def main():
     """ Main method """
     window = arcade.Window(config.SCREEN_WIDTH, config.SCREEN_HEIGHT, config.SCREEN_TITLE, gc_mode="context_gc",
                            resizable=True)
+    STARTUP.mark("window")
+    threading.Thread(target=preload, name="preload", daemon=True).start()
     window.show_view(StartView())
     arcade.run()
 
+    # Write chunk edits that are still pending
+    if isinstance(window.current_view, Game):
+        window.current_view.world.shutdown()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,103 @@
+"""
+Prebaked texture atlas. Every block, break animation, item and mob PNG is
+packed into one image with a JSON index of where each one is, so startup
+reads and decodes a single file instead of one per texture::
+
+    {"sprites/130.png": [x, y, width, height], ...}
+
+The atlas is made by a build step, ``python src/build_assets.py``, and is
+only loaded at runtime.
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import arcade
+from PIL import Image
+
+import config
+from misc.startup import STARTUP
+
+SOURCE_DIRS = ("sprites", "animations", "item", "mobs")
+# Wide enough for the widest source image
+ATLAS_WIDTH = 256
+PADDING = 1
+
+Region = Tuple[int, int, int, int]
+
+
+class AtlasError(Exception):
+    pass
+
+
+def sources(asset_dir: Path = config.ASSET_DIR) -> List[Path]:
+    return sorted(path for name in SOURCE_DIRS for path in (asset_dir / name).glob("*.png"))
+
+
+def is_stale(index: Dict[str, Region], asset_dir: Path = config.ASSET_DIR) -> bool:
+    """
+    Does the atlas lack a source or hold one that is gone. Not the modification
+    times, git does not keep them.
+    """
+    return set(index) != {path.relative_to(asset_dir).as_posix() for path in sources(asset_dir)}
+
+
+def build_atlas(asset_dir: Path = config.ASSET_DIR, image_path: Path = config.ATLAS_IMAGE,
+                index_path: Path = config.ATLAS_INDEX) -> Dict[str, Region]:
+    """Pack the source images into shelves, tallest first, and write the atlas and its index"""
+    paths = sources(asset_dir)
+    # PIL releases the GIL while decoding
+    with ThreadPoolExecutor() as pool:
+        decoded = pool.map(_decode, paths)
+    images = {path.relative_to(asset_dir).as_posix(): image for path, image in zip(paths, decoded)}
+
+    index: Dict[str, Region] = {}
+    x = y = shelf_height = 0
+    for name, image in sorted(images.items(), key=lambda item: (-item[1].height, item[0])):
+        width, height = image.size
+        if x + width > ATLAS_WIDTH:
+            x, y = 0, y + shelf_height + PADDING
+            shelf_height = 0
+        index[name] = (x, y, width, height)
+        x += width + PADDING
+        shelf_height = max(shelf_height, height)
+
+    atlas = Image.new("RGBA", (ATLAS_WIDTH, y + shelf_height), (0, 0, 0, 0))
+    for name, (x, y, _, _) in index.items():
+        atlas.paste(images[name], (x, y))
+
+    atlas.save(image_path)
+    index_path.write_text(json.dumps(index, indent=1, sort_keys=True))
+    print(f"Packed {len(index)} textures into {image_path}")
+    return index
+
+
+def _decode(path: Path) -> Image.Image:
+    with Image.open(path) as image:
+        return image.convert("RGBA")
+
+
+def _texture(name: str, image: Image.Image) -> arcade.Texture:
+    # The Texture constructor changed between arcade releases
+    try:
+        return arcade.Texture(image, hash=name)
+    except TypeError:
+        return arcade.Texture(name, image=image)
+
+
+def load_atlas(asset_dir: Path = config.ASSET_DIR, image_path: Path = config.ATLAS_IMAGE,
+               index_path: Path = config.ATLAS_INDEX) -> Dict[str, arcade.Texture]:
+    """Textures by path relative to the asset directory, all cut from one atlas image"""
+    if not image_path.exists() or not index_path.exists():
+        raise AtlasError(f"No texture atlas at {image_path}, build it with: python src/build_assets.py")
+
+    with STARTUP.asset("atlas_load"):
+        index = json.loads(index_path.read_text())
+        if is_stale(index, asset_dir):
+            print("The texture atlas does not match the textures, rebuild it with: python src/build_assets.py")
+        atlas = _decode(image_path)
+        return {
+            name: _texture(f"atlas:{name}", atlas.crop((x, y, x + width, y + height)))
+            for name, (x, y, width, height) in index.items()
+        }
@@ -0,0 +1,129 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, Optional, Set
+
+from misc.chunk import HorizontalChunk
+
+
+class ChunkCache:
+    """
+    Loaded chunks kept in least recently used order.
+
+    Inactive chunks over budget are evicted in two steps. First their sprites
+    are dropped while the block array stays cached, then the chunk is dropped
+    entirely once its edits are flushed to disk.
+
+    :meth:`get` counts a hit, rebuild or miss, so call it once each time a
+    chunk is needed and poll with :meth:`peek`.
+    """
+
+    def __init__(
+        self,
+        max_sprite_chunks: int,
+        max_chunks: int,
+        flush: Callable[[Iterable[HorizontalChunk]], None],
+    ):
+        """
+        :param int max_sprite_chunks: Chunks allowed to keep their sprites
+        :param int max_chunks: Chunks allowed to stay in memory at all
+        :param flush: Writes pending edits of chunks about to be dropped
+        """
+        self.max_sprite_chunks = max_sprite_chunks
+        self.max_chunks = max_chunks
+        self._flush = flush
+        self._chunks: "OrderedDict[int, HorizontalChunk]" = OrderedDict()
+        # Chunks stored since they were last needed, their miss or rebuild is already counted
+        self._fresh: Set[int] = set()
+
+        self.hits = 0
+        self.rebuilds = 0
+        self.misses = 0
+        self.sprite_evictions = 0
+        self.evictions = 0
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._chunks
+
+    def __getitem__(self, index: int) -> HorizontalChunk:
+        return self._chunks[index]
+
+    def __setitem__(self, index: int, chunk: HorizontalChunk):
+        self._chunks[index] = chunk
+        self._chunks.move_to_end(index)
+        self._fresh.add(index)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._chunks)
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def items(self):
+        return self._chunks.items()
+
+    def values(self):
+        return self._chunks.values()
+
+    def get(self, index: int) -> Optional[HorizontalChunk]:
+        """Get a chunk that is needed, marking it as recently used"""
+        chunk = self._chunks.get(index)
+        if chunk is None:
+            self.misses += 1
+            return None
+
+        self._chunks.move_to_end(index)
+        if index in self._fresh:
+            self._fresh.remove(index)
+        elif chunk.has_sprites:
+            self.hits += 1
+        else:
+            self.rebuilds += 1
+        return chunk
+
+    def peek(self, index: int) -> Optional[HorizontalChunk]:
+        """Get a chunk without touching the statistics or the order"""
+        return self._chunks.get(index)
+
+    @property
+    def sprite_chunks(self) -> int:
+        """Number of cached chunks holding sprites"""
+        return sum(1 for chunk in self._chunks.values() if chunk.has_sprites)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "chunks": len(self._chunks),
+            "sprite_chunks": self.sprite_chunks,
+            "hits": self.hits,
+            "rebuilds": self.rebuilds,
+            "misses": self.misses,
+            "sprite_evictions": self.sprite_evictions,
+            "evictions": self.evictions,
+        }
+
+    def evict(self, active: Set[int]):
+        """Evict least recently used chunks over budget that are not active"""
+        for index in active:
+            if index in self._chunks:
+                self._chunks.move_to_end(index)
+
+        # Oldest first
+        inactive = [chunk for index, chunk in self._chunks.items() if index not in active]
+
+        excess = self.sprite_chunks - self.max_sprite_chunks
+        for chunk in inactive:
+            if excess <= 0:
+                break
+            if chunk.has_sprites:
+                chunk.release_sprites()
+                self._fresh.discard(chunk.index)
+                self.sprite_evictions += 1
+                excess -= 1
+
+        excess = len(self._chunks) - self.max_chunks
+        if excess > 0:
+            dropped = inactive[:excess]
+            self._flush(dropped)
+            for chunk in dropped:
+                del self._chunks[chunk.index]
+                self._fresh.discard(chunk.index)
+            self.evictions += len(dropped)
@@ -1,26 +1,59 @@
 from collections import Counter
+from collections.abc import Mapping
 from itertools import combinations
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 import arcade
 import numpy as np
+import numpy.typing as npt
 
 import config
 import utils
-from block.block import Block
+from block.block import Block, BlockRecord
+from constants import BlockConstants
+from misc import codec
+
+
+class ChunkData(Mapping):
+    """Read only ``(x, y) -> block_id`` view of a chunk's block array"""
+
+    def __init__(self, blocks: npt.NDArray[np.uint8]):
+        self._blocks = blocks
+
+    def __getitem__(self, key: Tuple[int, int]) -> int:
+        x, y = key
+        if not (0 <= x < config.CHUNK_WIDTH and 0 <= y < config.CHUNK_HEIGHT):
+            raise KeyError(key)
+        return int(self._blocks[y, x])
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        for y in range(config.CHUNK_HEIGHT):
+            for x in range(config.CHUNK_WIDTH):
+                yield x, y
+
+    def __len__(self) -> int:
+        return self._blocks.size
 
 
 class HorizontalChunk:
     COMBINATIONS = (0, 1, -1, 0, 1, -1)
+    # Bump when the encoded chunk format changes
+    FORMAT_VERSION = 4
 
-    def __init__(self, x: int, index: int, data: Optional[Dict] = None):
+    def __init__(self, x: int, index: int, blocks: Optional[npt.NDArray[np.uint8]] = None):
         """
         :param int x: x position of the chunk
         :param int index: File index for this chunk
-        :param data: Chunk data
+        :param blocks: Block ids as a (CHUNK_HEIGHT, CHUNK_WIDTH) array indexed [y, x]
         """
-        self.data = data or {}
+        if blocks is None:
+            blocks = np.full((config.CHUNK_HEIGHT, config.CHUNK_WIDTH), BlockConstants.sky, dtype=np.uint8)
+        self.blocks: npt.NDArray[np.uint8] = blocks
         self._block_data = {}
+        # Edited since it was last written to disk
+        self.dirty = False
+        # Sprites have been made for every block
+        self.has_sprites = False
 
         self._index = index
         self._x = x
@@ -28,8 +61,19 @@ class HorizontalChunk:
         self._y = 0
         self._chunks = 0
 
-        self._blocks = arcade.SpriteList(use_spatial_hash=True, lazy=True)
-        self._bg_blocks = arcade.SpriteList(use_spatial_hash=True, lazy=True)
+        # Sprites split into vertical sections of SECTION_HEIGHT rows, keyed by
+        # section index. A section's list is only made with its first sprite.
+        self._blocks: Dict[int, arcade.SpriteList] = {}
+        self._bg_blocks: Dict[int, arcade.SpriteList] = {}
+        # Solid blocks next to a non-solid one, the only ones the player can touch.
+        # Left empty with TILE_PHYSICS, the player then collides with the blocks array.
+        self._walls: Dict[int, arcade.SpriteList] = {}
+        self._wall_keys: Set[Tuple[int, int]] = set()
+        # Solid cells of the neighbouring columns in the chunks to the left (-1)
+        # and right (1), None while that chunk has not been loaded
+        self._neighbour_edges: Dict[int, Optional[npt.NDArray[np.bool_]]] = {-1: None, 1: None}
+        # Cloud cells baked into one shape list when sky sprites are off
+        self._clouds: Optional[arcade.ShapeElementList] = None
 
         self.bg_block_count = 0
         self.other_block_count = 0
@@ -45,8 +89,74 @@ class HorizontalChunk:
         return self._index
 
     @property
-    def spritelist(self) -> arcade.SpriteList:
-        return self._blocks
+    def data(self) -> ChunkData:
+        """Block ids keyed by ``(x, y)``, kept for callers of the old dict storage"""
+        return ChunkData(self.blocks)
+
+    @property
+    def sprite_count(self) -> int:
+        """Number of sprites this chunk currently holds"""
+        return sum(map(len, self._blocks.values())) + sum(map(len, self._bg_blocks.values()))
+
+    @staticmethod
+    def _section(sections: Dict[int, arcade.SpriteList], section: int, collision: bool = False) -> arcade.SpriteList:
+        """
+        Sprite list of a section, made when it gets its first sprite. Only the
+        collision layer is queried by position, so only it keeps a spatial hash.
+        """
+        sprites = sections.get(section)
+        if sprites is None:
+            sprites = sections[section] = arcade.SpriteList(use_spatial_hash=collision, lazy=True)
+        return sprites
+
+    def sections(self, start: int, stop: int) -> List[arcade.SpriteList]:
+        """Collision sprite lists of the sections ``start`` up to ``stop`` that hold any"""
+        walls = self._walls
+        return [walls[section] for section in range(max(start, 0), stop) if section in walls]
+
+    @property
+    def wall_count(self) -> int:
+        """Number of blocks in the collision layer"""
+        return len(self._wall_keys)
+
+    def exposed(self) -> npt.NDArray[np.bool_]:
+        """
+        Solid blocks with at least one non-solid neighbour. Beside the edge
+        columns the neighbouring chunks' edges are used, cells of chunks that
+        were not loaded yet and above or below the chunk count as non-solid.
+        """
+        solid = np.pad(self.blocks > BlockConstants.clouds, 1)
+        for side, column in ((-1, 0), (1, -1)):
+            edge = self._neighbour_edges[side]
+            if edge is not None:
+                solid[1:-1, column] = edge
+        buried = solid[:-2, 1:-1] & solid[2:, 1:-1] & solid[1:-1, :-2] & solid[1:-1, 2:]
+        return solid[1:-1, 1:-1] & ~buried
+
+    def edge(self, side: int) -> npt.NDArray[np.bool_]:
+        """Solid cells of the left (-1) or right (1) column"""
+        return self.blocks[:, 0 if side < 0 else -1] > BlockConstants.clouds
+
+    def set_neighbour_edge(self, side: int, edge: npt.NDArray[np.bool_]) -> bool:
+        """
+        Take the facing column of the chunk to the left (-1) or right (1) when it
+        is loaded or edited, and update the collision layer of this side
+
+        :return: True if a new collision sprite list was made
+        """
+        if config.TILE_PHYSICS:
+            return False
+        self._neighbour_edges[side] = edge.copy()
+        if not self.has_sprites:
+            return False
+        return self._refresh_walls([0 if side < 0 else config.CHUNK_WIDTH - 1])
+
+    def block_at(self, x: int, y: int) -> Optional[BlockRecord]:
+        """Solid block at a local position, None for sky, clouds or outside the chunk"""
+        block_id = self.get(x, y)
+        if block_id is None or block_id <= BlockConstants.clouds:
+            return None
+        return BlockRecord(self._x + x, y, block_id)
 
     def is_visible(self, x_pos: float, max_dist: float) -> bool:
         """Is this chunk visible (in pixels)"""
@@ -66,98 +176,166 @@ class HorizontalChunk:
         # Otherwise we have a visible chunk
         return True
 
+    def encode(self) -> bytes:
+        """Serialize the chunk data for storage"""
+        return codec.encode(self.blocks)
+
+    @classmethod
+    def decode(cls, index: int, payload: bytes) -> "HorizontalChunk":
+        """Create a chunk from data serialized with :meth:`encode`, decoded into its own array"""
+        chunk = cls(index * config.CHUNK_WIDTH, index)
+        codec.decode_into(payload, chunk.blocks)
+        return chunk
+
     def make_sprite_list(self):
-        for (x_inc, y_inc), block_id in self.data.items():
-            # HACK: Remove air blocks for now. No longer the hack is needed.
-            cx = (self._x + x_inc) * config.SPRITE_PIXEL_SIZE
-            cy = y_inc * config.SPRITE_PIXEL_SIZE
-            block = Block(
-                width=config.SPRITE_PIXEL_SIZE,
-                height=config.SPRITE_PIXEL_SIZE,
-                breaking_time=2,
-                hp=2,
-                block_id=block_id,
-                bright=False,
-                center_x=cx,
-                center_y=cy)
-
-            self._block_data[(x_inc, y_inc)] = block
-
-            if block_id > 129:
-                self._blocks.append(block)
-            else:
-                self._bg_blocks.append(block)
-
-            yield
-
-    def __getitem__(self, key: int):
+        """
+        Make sprites for every block, one per step. The blocks are read once up
+        front, so the world does not edit the chunk before ``has_sprites`` is set.
+        """
+        sky_sprites = config.SKY_SPRITES
+        walls = not config.TILE_PHYSICS
+        exposed = self.exposed().tolist() if walls else None
+        for y_inc, row in enumerate(self.blocks.tolist()):
+            for x_inc, block_id in enumerate(row):
+                # Sky is the clear colour and clouds are baked in draw()
+                if block_id <= BlockConstants.clouds and not sky_sprites:
+                    continue
+                cx = (self._x + x_inc) * config.SPRITE_PIXEL_SIZE
+                cy = y_inc * config.SPRITE_PIXEL_SIZE
+                block = Block(block_id, center_x=cx, center_y=cy)
+
+                self._block_data[(x_inc, y_inc)] = block
+
+                section = y_inc // config.SECTION_HEIGHT
+                if block_id > 129:
+                    self._section(self._blocks, section).append(block)
+                    if walls and exposed[y_inc][x_inc]:
+                        self._section(self._walls, section, collision=True).append(block)
+                        self._wall_keys.add((x_inc, y_inc))
+                else:
+                    self._section(self._bg_blocks, section).append(block)
+
+                yield
+        self.has_sprites = True
+        # A neighbour may have loaded since the exposed cells were found
+        if walls:
+            self._refresh_walls([0, config.CHUNK_WIDTH - 1])
+
+    def release_sprites(self):
+        """Drop all sprites, keeping only the block array"""
+        self._blocks = {}
+        self._bg_blocks = {}
+        self._walls = {}
+        self._wall_keys = set()
+        self._block_data = {}
+        self._clouds = None
+        self.has_sprites = False
+
+    def get(self, x: int, y: int) -> Optional[int]:
+        """Block id at a local position, None outside the chunk"""
+        if 0 <= x < config.CHUNK_WIDTH and 0 <= y < config.CHUNK_HEIGHT:
+            return int(self.blocks[y, x])
+        return None
+
+    def __getitem__(self, key: Tuple[int, int]) -> int:
         return self.data[key]
 
     def __setitem__(self, _: Any, value: utils.TArray):
         self._chunks += 1
-        for y_row in np.flip(value.arr):
-            for x_inc, block_ in enumerate(y_row):
-                if block_ > 129:
-                    self.other_block_count += 1
-                else:
-                    self.bg_block_count += 1
-                self.data[x_inc, self._y] = block_
-            self._y += 1
+        rows = np.flip(value.arr)
+        self.blocks[self._y:self._y + len(rows)] = rows
+        self._y += len(rows)
+        solid = int(np.count_nonzero(rows > 129))
+        self.other_block_count += solid
+        self.bg_block_count += rows.size - solid
         c = Counter(self.biomes)
         c.update(value.adv_info)
         self.biomes = dict(c)
 
     def __iter__(self):
-        return self.data.__iter__()
+        return iter(self.data)
 
     def __repr__(self):
         return f"Chunk[{self.index}]"
 
-    def draw(self):
-        self._blocks.draw(pixelated=True)
-        self._bg_blocks.draw(pixelated=True)
+    def draw(self, start: int = 0, stop: Optional[int] = None):
+        """Draw the sections ``start`` up to ``stop``, all of them by default"""
+        if not config.SKY_SPRITES:
+            if self._clouds is None:
+                self._clouds = self._bake_clouds()
+            self._clouds.draw()
+        if stop is None:
+            stop = config.CHUNK_HEIGHT // config.SECTION_HEIGHT
+        for section in range(max(start, 0), stop):
+            blocks = self._blocks.get(section)
+            if blocks is not None:
+                blocks.draw(pixelated=True)
+            bg_blocks = self._bg_blocks.get(section)
+            if bg_blocks is not None:
+                bg_blocks.draw(pixelated=True)
+
+    def _bake_clouds(self) -> arcade.ShapeElementList:
+        """One rectangle per vertical run of cloud cells"""
+        shapes = arcade.ShapeElementList()
+        size = config.SPRITE_PIXEL_SIZE
+        clouds = self.blocks == BlockConstants.clouds
+        for x_inc in np.flatnonzero(clouds.any(axis=0)):
+            column = np.concatenate(([False], clouds[:, x_inc], [False]))
+            edges = np.flatnonzero(column[1:] != column[:-1]).reshape(-1, 2)
+            for start, end in edges.tolist():
+                shapes.append(arcade.create_rectangle_filled(
+                    (self._x + x_inc) * size,
+                    (start + end - 1) * size / 2,
+                    size,
+                    (end - start) * size,
+                    config.CLOUD_COLOR,
+                ))
+        return shapes
+
+    def remove(self, block: BlockRecord) -> bool:
+        """
+        Replace a block with sky
 
-    def remove(self, block: Block):
-        block.remove_from_sprite_lists()
+        :return: True if a new collision sprite list was made
+        """
+        sprite = self._block_data.get((block.x - self._x, block.y))
+        if sprite is not None:
+            sprite.remove_from_sprite_lists()
         self._block_remove(block.center_x, block.center_y)
+        new_walls = self._update_walls(block.center_x, block.center_y)
+        if not config.SKY_SPRITES:
+            return new_walls
 
-        new_block = Block(
-            width=config.SPRITE_PIXEL_SIZE,
-            height=config.SPRITE_PIXEL_SIZE,
-            breaking_time=2,
-            hp=2,
-            block_id=128,
-            bright=False,
-            center_x=block.center_x,
-            center_y=block.center_y
-        )
-        self._bg_blocks.append(new_block)
+        new_block = Block(BlockConstants.sky, center_x=block.center_x, center_y=block.center_y)
+        self._section_of(self._bg_blocks, new_block).append(new_block)
         self._block_add(new_block)
+        return new_walls
+
+    def add(self, center_x, center_y, block_id) -> bool:
+        """
+        Place a block over sky or clouds
 
-    def add(self, center_x, center_y, block_id):
-        block = self._block_data.get((
-            center_x // config.SPRITE_PIXEL_SIZE - self.x,
-            center_y // config.SPRITE_PIXEL_SIZE,
-        ))
-        if not block:
-            return
-        block.remove_from_sprite_lists()
+        :return: True if a new collision sprite list was made
+        """
+        x = int(center_x // config.SPRITE_PIXEL_SIZE - self.x)
+        y = int(center_y // config.SPRITE_PIXEL_SIZE)
+        # Only sky and clouds can be replaced
+        old_id = self.get(x, y)
+        if old_id is None or old_id > BlockConstants.clouds:
+            return False
+        block = self._block_data.get((x, y))
+        if block:
+            block.remove_from_sprite_lists()
+        if old_id == BlockConstants.clouds:
+            self._clouds = None
         self._block_remove(center_x, center_y)
 
-        new_block = Block(
-            width=config.SPRITE_PIXEL_SIZE,
-            height=config.SPRITE_PIXEL_SIZE,
-            breaking_time=2,
-            hp=2,
-            block_id=block_id,
-            bright=False,
-            center_x=center_x,
-            center_y=center_y
-        )
-        self._blocks.append(new_block)
+        new_block = Block(block_id, center_x=center_x, center_y=center_y)
+        self._section_of(self._blocks, new_block).append(new_block)
         self._block_add(new_block)
+        return self._update_walls(center_x, center_y)
 
-    def get_neighbouring_blocks(self, block: Block) -> Dict[str, Optional[Block]]:
+    def get_neighbouring_blocks(self, block: BlockRecord) -> Dict[str, Optional[int]]:
         bx, by = (block.center_x // config.SPRITE_PIXEL_SIZE) % config.CHUNK_WIDTH, (block.center_y //
                                                                                      config.SPRITE_PIXEL_SIZE) %\
                  config.CHUNK_HEIGHT
@@ -169,20 +347,61 @@ class HorizontalChunk:
         ret = {}
         for x, y in unique_combs:
             direction = y_dict[y] + x_dict[x]
-            ret[direction] = [None if self.data.get((bx + x, by + y)) in (128, 129) else
-                              self.data.get((bx + x, by + y))][0]
+            block_id = self.get(int(bx + x), int(by + y))
+            ret[direction] = None if block_id in (128, 129) else block_id
         return ret
 
+    def _update_walls(self, center_x: float, center_y: float) -> bool:
+        """Add or drop the edited block and its neighbours from the collision layer"""
+        if config.TILE_PHYSICS:
+            return False
+        x = int(center_x // config.SPRITE_PIXEL_SIZE) % config.CHUNK_WIDTH
+        y = int(center_y // config.SPRITE_PIXEL_SIZE) % config.CHUNK_HEIGHT
+        exposed = self.exposed()
+        new_walls = False
+        for key in ((x, y), (x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if self.get(*key) is not None:
+                new_walls |= self._set_wall(key, bool(exposed[key[1], key[0]]))
+        return new_walls
+
+    def _refresh_walls(self, columns: List[int]) -> bool:
+        """Bring the collision layer of whole columns in line with :meth:`exposed`"""
+        exposed = self.exposed()
+        new_walls = False
+        for x in columns:
+            for y, is_exposed in enumerate(exposed[:, x].tolist()):
+                new_walls |= self._set_wall((x, y), is_exposed)
+        return new_walls
+
+    def _set_wall(self, key: Tuple[int, int], exposed: bool) -> bool:
+        """Add or drop a block from the collision layer, True if that made a new section list"""
+        block = self._block_data.get(key)
+        if exposed and block is not None and key not in self._wall_keys:
+            new_section = key[1] // config.SECTION_HEIGHT not in self._walls
+            self._section_of(self._walls, block, collision=True).append(block)
+            self._wall_keys.add(key)
+            return new_section
+        if not exposed and key in self._wall_keys:
+            self._wall_keys.remove(key)
+            if block is not None:
+                self._section_of(self._walls, block, collision=True).remove(block)
+        return False
+
+    @classmethod
+    def _section_of(cls, sections: Dict[int, arcade.SpriteList], block: Block, collision: bool = False
+                    ) -> arcade.SpriteList:
+        return cls._section(sections, int(block.center_y // config.SECTION_HEIGHT_PIXELS), collision)
+
     def _block_add(self, new_block: Block):
-        key_ = ((new_block.center_x // config.SPRITE_PIXEL_SIZE) % config.CHUNK_WIDTH, (new_block.center_y //
-                                                                                        config.SPRITE_PIXEL_SIZE) %
-                config.CHUNK_HEIGHT)
-        self.data[key_] = new_block.block_id
+        key_ = (int(new_block.center_x // config.SPRITE_PIXEL_SIZE) % config.CHUNK_WIDTH,
+                int(new_block.center_y // config.SPRITE_PIXEL_SIZE) % config.CHUNK_HEIGHT)
+        self.blocks[key_[1], key_[0]] = new_block.block_id
         self._block_data[key_] = new_block
+        self.dirty = True
 
     def _block_remove(self, x: int, y: int):
-        key_ = ((x // config.SPRITE_PIXEL_SIZE) % config.CHUNK_WIDTH, (y //
-                                                                       config.SPRITE_PIXEL_SIZE) %
-                config.CHUNK_HEIGHT)
-        del (self.data[key_])
-        del (self._block_data[key_])
+        key_ = (int(x // config.SPRITE_PIXEL_SIZE) % config.CHUNK_WIDTH,
+                int(y // config.SPRITE_PIXEL_SIZE) % config.CHUNK_HEIGHT)
+        self.blocks[key_[1], key_[0]] = BlockConstants.sky
+        self._block_data.pop(key_, None)
+        self.dirty = True
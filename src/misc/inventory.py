@@ -1,10 +1,11 @@
-from typing import Optional
+from typing import List, Optional
 
 import arcade.key
 from arcade import Sprite
 from pyglet.math import Vec2
 
 import config
+from block.block import TEXTURES
 from misc.item import Item
 
 
@@ -16,7 +17,7 @@ class InventoryFullError(Exception):
 class Inventory(Sprite):
     def __init__(self) -> None:
         super().__init__(
-            config.ASSET_DIR / "sprites" / "inventory.png",
+            TEXTURES["sprites/inventory.png"],
             center_x=0,
             center_y=0,
             scale=config.INVENTORY_SCALING,
@@ -24,11 +25,18 @@ class Inventory(Sprite):
         self.max_slots: int = config.MAX_SLOTS
         self.slots: dict[int, Optional[Item]] = {i: None for i in range(1, self.max_slots + 1)}
         self.filled_slots = 0
-        self.selected_slot = 1
+        self._selected_slot = 1
+
+        # The hotbar as drawn, rebuilt only after something in it changed
+        self._hud = arcade.SpriteList(lazy=True)
+        self._hud_texts: List[arcade.Text] = []
+        self._hud_outline: Optional[arcade.ShapeElementList] = None
+        self._hud_dirty = True
 
     def add(self, item: Item) -> None:
         if self.filled_slots == self.max_slots:
             return
+        self._hud_dirty = True
         added = False
         if item.stackable:
             for i in range(len(self.slots), 0, -1):
@@ -48,6 +56,7 @@ class Inventory(Sprite):
     def setup_coords(self, pos: Vec2) -> None:
         self.center_x = pos[0] + config.SCREEN_WIDTH / 2
         self.center_y = pos[1] + self.height / 2
+        self._hud_dirty = True
 
     def get_free_slot(self) -> int:
         for slot in self.slots:
@@ -56,22 +65,47 @@ class Inventory(Sprite):
         raise InventoryFullError
 
     def smart_draw(self):
-        self.draw()
+        if self._hud_dirty:
+            self._rebuild_hud()
+        self._hud.draw()
+        self._hud_outline.draw()
+        for text in self._hud_texts:
+            text.draw()
+
+    def _rebuild_hud(self):
+        """Lay out the hotbar sprites, stack counts and selection outline"""
+        self._hud.clear()
+        self._hud.append(self)
+        self._hud_texts = []
         for slot, item in self.slots.items():
-            if slot == self.selected_slot:
-                self.draw_outline(slot)
             if item:
-                item.smart_draw(slot, self.center_x, self.center_y, self.width, self.height)
+                self._hud.append(item.place_in_slot(slot, self.center_x, self.center_y, self.width, self.height))
+                self._hud_texts.append(item.amount_text())
+
+        self._hud_outline = arcade.ShapeElementList()
+        self._hud_outline.append(self.outline_shape(self.selected_slot))
+        self._hud_dirty = False
 
     def remove(self, item: Item) -> None:
         for i in range(len(self.slots), 0, -1):
             slot_item = self.slots[i]
             if slot_item is not None and slot_item.block_id == item.block_id:
+                self._hud_dirty = True
                 slot_item.amount -= 1
                 if slot_item.amount == 0:
                     self.slots[i] = None
                 break
 
+    @property
+    def selected_slot(self) -> int:
+        return self._selected_slot
+
+    @selected_slot.setter
+    def selected_slot(self, slot: int):
+        if slot != self._selected_slot:
+            self._selected_slot = slot
+            self._hud_dirty = True
+
     def change_slot_keyboard(self, key_pressed: int = 0):
         # https://api.arcade.academy/en/latest/arcade.key.html?highlight=arcade.key ->  Numbers on the main keyboard
         if 57 >= key_pressed > 48:
@@ -88,6 +122,12 @@ class Inventory(Sprite):
             return
         self.selected_slot -= scroll_y
 
+    @property
+    def selected_block_id(self) -> Optional[int]:
+        """Block id of the item in the selected slot"""
+        item = self.slots[self.selected_slot]
+        return item.block_id if item else None
+
     def get_selected_item(self, center_x: int, center_y: int) -> Optional[arcade.Sprite]:
         item = self.slots[self.selected_slot]
         if not item:
@@ -99,15 +139,17 @@ class Inventory(Sprite):
         item = self.slots[self.selected_slot]
         if not item:
             return
+        self._hud_dirty = True
         item.amount -= 1
         if not item.amount:
             self.slots[self.selected_slot] = None
         return item.block_id
 
-    def draw_outline(self, slot: int):
+    def outline_shape(self, slot: int) -> arcade.Shape:
+        """Outline of a slot"""
         rw = config.ICON_SIZE * config.INVENTORY_SCALING
         rx = self.center_x - (self.width / 2) + config.INVENTORY_SCALING * 15 \
             + ((rw + config.INVENTORY_SCALING) * (slot - 1))
         ry = self.center_y - (self.height / 2) + 2 + config.INVENTORY_SCALING * 29/3
-        arcade.draw_rectangle_outline(center_x=rx, center_y=ry, width=rw, height=rw, color=(200, 200, 200),
-                                      border_width=4)
+        return arcade.create_rectangle_outline(center_x=rx, center_y=ry, width=rw, height=rw, color=(200, 200, 200),
+                                               border_width=4)
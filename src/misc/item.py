@@ -1,39 +1,72 @@
-from arcade import Sprite, draw_text
+from typing import Dict, Optional
+
+from arcade import Sprite, Text, Texture, load_texture
 from arcade.csscolor import WHITE
 
 import config
+from block.block import BLOCK_TEXTURES, TEXTURES
 
+# Item textures by block id, starting with the preloaded block textures
+_ITEM_TEXTURES: Dict[int, Texture] = dict(BLOCK_TEXTURES)
+# One held item sprite per block id, only moved around after it is made
+_HAND_SPRITES: Dict[int, Sprite] = {}
 
-class Item(Sprite):
 
-    def __init__(self, stackable: bool, block_id: int, *args, **kwargs):
-        super().__init__(
-            config.ASSET_DIR / "sprites" / f"{block_id}.png",
-            scale=config.INVENTORY_SCALING,
-            *args,
-            **kwargs,
+def item_texture(block_id: int) -> Texture:
+    """Texture of an item, ids that are not blocks come from the atlas or are loaded once on first use"""
+    texture = _ITEM_TEXTURES.get(block_id)
+    if texture is None:
+        texture = TEXTURES.get(f"sprites/{block_id}.png") or load_texture(
+            config.ASSET_DIR / "sprites" / f"{block_id}.png"
         )
+        _ITEM_TEXTURES[block_id] = texture
+    return texture
+
+
+class Item:
+    """A stack of items. The sprite drawing it is only made once it is drawn."""
+    __slots__ = ("stackable", "block_id", "amount", "_sprite")
+
+    def __init__(self, stackable: bool, block_id: int, amount: int = 1):
         self.stackable = stackable
-        self.amount = 1
-        self.width = config.ICON_SIZE * config.INVENTORY_SCALING
-        self.height = config.ICON_SIZE * config.INVENTORY_SCALING
         self.block_id = block_id
+        self.amount = amount
+        self._sprite: Optional[Sprite] = None
 
-    def smart_draw(self, slot: int, cen_x: float, cen_y: float, inv_width: int, inv_height: int) -> None:
-        self.center_x = cen_x - (inv_width / 2) + config.INVENTORY_SCALING * 15 + \
-                        ((self.width + config.INVENTORY_SCALING) * (slot - 1))
-        self.center_y = cen_y - (inv_height / 2) + 2*config.INVENTORY_SCALING/3 + config.INVENTORY_SCALING * 29/3
+    @property
+    def sprite(self) -> Sprite:
+        if self._sprite is None:
+            self._sprite = Sprite(item_texture(self.block_id), scale=config.INVENTORY_SCALING)
+            self._sprite.width = config.ICON_SIZE * config.INVENTORY_SCALING
+            self._sprite.height = config.ICON_SIZE * config.INVENTORY_SCALING
+        return self._sprite
 
-        self.draw()
+    def place_in_slot(self, slot: int, cen_x: float, cen_y: float, inv_width: int, inv_height: int) -> Sprite:
+        """Move the item's sprite into a hotbar slot"""
+        sprite = self.sprite
+        sprite.center_x = cen_x - (inv_width / 2) + config.INVENTORY_SCALING * 15 + \
+            ((sprite.width + config.INVENTORY_SCALING) * (slot - 1))
+        sprite.center_y = cen_y - (inv_height / 2) + 2*config.INVENTORY_SCALING/3 + config.INVENTORY_SCALING * 29/3
+        return sprite
 
-        # draw_text("20", self.center_x - 20, self.center_y - 20, WHITE, 18)
-        draw_text(str(self.amount), self.center_x + 5, self.center_y - 20, WHITE, 12)
+    def amount_text(self) -> Text:
+        """Stack count drawn under the item"""
+        sprite = self.sprite
+        return Text(str(self.amount), sprite.center_x + 5, sprite.center_y - 20, WHITE, 12)
 
     def replicate(self, center_x: int, center_y: int):
         """Replicate for the player hand."""
-        return Sprite(
-            config.ASSET_DIR / "sprites" / f"{self.block_id}.png",
-            scale=1/(2 * config.SPRITE_PIXEL_SIZE),
-            center_x=center_x,
-            center_y=center_y
+        sprite = hand_sprite(self.block_id)
+        sprite.position = center_x, center_y
+        return sprite
+
+
+def hand_sprite(block_id: int) -> Sprite:
+    """The shared sprite of a block held in the player's hand"""
+    sprite = _HAND_SPRITES.get(block_id)
+    if sprite is None:
+        sprite = _HAND_SPRITES[block_id] = Sprite(
+            item_texture(block_id),
+            scale=1 / (2 * config.SPRITE_PIXEL_SIZE),
         )
+    return sprite
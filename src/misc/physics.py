@@ -0,0 +1,117 @@
+from math import ceil, floor
+from typing import Callable, List, Optional
+
+import arcade
+
+import config
+from constants import BlockConstants
+from misc.chunk import HorizontalChunk
+
+_SIZE = config.SPRITE_PIXEL_SIZE
+_HALF = config.SPRITE_PIXEL_SIZE / 2
+# Edges resolved onto a cell border can be a rounding error off it
+_EPSILON = 1e-6
+
+
+def _first_cell(position: float) -> int:
+    """Cell holding a position"""
+    return floor((position + _HALF) / _SIZE + _EPSILON)
+
+
+def _last_cell(position: float) -> int:
+    """Last cell covered by a span ending at a position"""
+    return ceil((position + _HALF) / _SIZE - _EPSILON) - 1
+
+
+class TileGridPhysics:
+    """
+    Platformer physics resolved against the chunk block arrays instead of
+    sprite lists. Takes the place of ``arcade.PhysicsEnginePlatformer`` for
+    one sprite, looking up only the cells its bounding box passes through.
+
+    Chunks that are not loaded count as solid so nothing falls into them.
+    """
+
+    def __init__(
+        self,
+        player_sprite: arcade.Sprite,
+        get_chunk: Callable[[int], Optional[HorizontalChunk]],
+        gravity_constant: float = 0.5,
+    ):
+        """
+        :param player_sprite: Sprite to move
+        :param get_chunk: Returns the loaded chunk at a chunk index, or None
+        :param float gravity_constant: Downward acceleration per update
+        """
+        self.player_sprite = player_sprite
+        self.gravity_constant = gravity_constant
+        self._get_chunk = get_chunk
+        # Only kept to match the sprite based engine, collisions never use it
+        self.walls: List[arcade.SpriteList] = []
+
+    def is_solid(self, cell_x: int, cell_y: int) -> bool:
+        """Is a cell solid, cells below and above the world are not"""
+        if not 0 <= cell_y < config.CHUNK_HEIGHT:
+            return False
+        chunk = self._get_chunk(cell_x // config.CHUNK_WIDTH)
+        if chunk is None:
+            return True
+        return chunk.blocks[cell_y, cell_x % config.CHUNK_WIDTH] > BlockConstants.clouds
+
+    def _any_solid_row(self, cell_y: int, left: float, right: float) -> bool:
+        return any(self.is_solid(cell_x, cell_y) for cell_x in range(_first_cell(left), _last_cell(right) + 1))
+
+    def _any_solid_column(self, cell_x: int, bottom: float, top: float) -> bool:
+        return any(self.is_solid(cell_x, cell_y) for cell_y in range(_first_cell(bottom), _last_cell(top) + 1))
+
+    def can_jump(self, y_distance: float = 5) -> bool:
+        """Is there ground within ``y_distance`` pixels below the sprite"""
+        sprite = self.player_sprite
+        bottom = sprite.bottom
+        return any(
+            self._any_solid_row(cell_y, sprite.left, sprite.right)
+            for cell_y in range(_first_cell(bottom - y_distance), _last_cell(bottom) + 1)
+        )
+
+    def update(self):
+        """Apply gravity and move the sprite, stopping it at solid cells"""
+        sprite = self.player_sprite
+        sprite.change_y -= self.gravity_constant
+        self._move_y(sprite, sprite.change_y)
+        self._move_x(sprite, sprite.change_x)
+
+    def _move_y(self, sprite: arcade.Sprite, dy: float):
+        left, right = sprite.left, sprite.right
+        if dy > 0:
+            top = sprite.top
+            for cell_y in range(_last_cell(top) + 1, _last_cell(top + dy) + 1):
+                if self._any_solid_row(cell_y, left, right):
+                    # Bumped the ceiling
+                    sprite.center_y += cell_y * _SIZE - _HALF - top
+                    sprite.change_y = 0
+                    return
+        elif dy < 0:
+            bottom = sprite.bottom
+            for cell_y in range(_first_cell(bottom) - 1, _first_cell(bottom + dy) - 1, -1):
+                if self._any_solid_row(cell_y, left, right):
+                    # Landed
+                    sprite.center_y += cell_y * _SIZE + _HALF - bottom
+                    sprite.change_y = 0
+                    return
+        sprite.center_y += dy
+
+    def _move_x(self, sprite: arcade.Sprite, dx: float):
+        bottom, top = sprite.bottom, sprite.top
+        if dx > 0:
+            right = sprite.right
+            for cell_x in range(_last_cell(right) + 1, _last_cell(right + dx) + 1):
+                if self._any_solid_column(cell_x, bottom, top):
+                    sprite.center_x += cell_x * _SIZE - _HALF - right
+                    return
+        elif dx < 0:
+            left = sprite.left
+            for cell_x in range(_first_cell(left) - 1, _first_cell(left + dx) - 1, -1):
+                if self._any_solid_column(cell_x, bottom, top):
+                    sprite.center_x += cell_x * _SIZE + _HALF - left
+                    return
+        sprite.center_x += dx
@@ -0,0 +1,89 @@
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+from typing import Deque, Dict, Iterator, Optional
+
+import arcade
+
+import config
+from utils import percentiles
+
+
+class FrameProfiler:
+    """
+    Times named phases of every frame. The latest samples of each phase are
+    kept in a ring buffer and summarized as percentiles in milliseconds.
+    """
+
+    def __init__(self, samples: int, enabled: bool = True):
+        """
+        :param int samples: Samples kept per phase
+        :param bool enabled: Record samples at all
+        """
+        self.samples = samples
+        self.enabled = enabled
+        self._phases: Dict[str, Deque[float]] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the body of a ``with`` block as one sample of a phase"""
+        if not self.enabled:
+            yield
+            return
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        """Add one sample to a phase"""
+        if not self.enabled:
+            return
+        buffer = self._phases.get(name)
+        if buffer is None:
+            buffer = self._phases[name] = deque(maxlen=self.samples)
+        buffer.append(seconds)
+
+    def clear(self):
+        self._phases.clear()
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """p50, p95, p99 and max milliseconds of every phase"""
+        return {
+            name: {
+                **{rank: seconds * 1000 for rank, seconds in percentiles(buffer).items()},
+                "max": max(buffer, default=0.0) * 1000,
+                "samples": len(buffer),
+            }
+            for name, buffer in self._phases.items()
+        }
+
+    def dump(self, path: Optional[Path] = None) -> Path:
+        """Write the summary and the raw samples of every phase to a JSON file"""
+        if path is None:
+            path = config.DATA_DIR / f"profile-{time.strftime('%Y%m%d-%H%M%S')}.json"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(json.dumps({
+            "stats": self.stats,
+            "samples_ms": {name: [seconds * 1000 for seconds in buffer] for name, buffer in self._phases.items()},
+        }, indent=2))
+        print(f"Profile written to {path}")
+        return path
+
+    def draw(self, x: float, y: float):
+        """Draw the summary as text with its top left corner at x, y"""
+        lines = [f"{'phase':<20}{'p50':>8}{'p95':>8}{'p99':>8}"]
+        lines += [
+            f"{name:<20}{stats['p50']:>8.2f}{stats['p95']:>8.2f}{stats['p99']:>8.2f}"
+            for name, stats in self.stats.items()
+        ]
+        for n, line in enumerate(lines):
+            arcade.draw_text(line, x, y - 14 * (n + 1), arcade.color.WHITE, 10, font_name="Courier New")
+
+
+PROFILER = FrameProfiler(config.PROFILER_SAMPLES, enabled=config.PROFILER_ENABLED)
@@ -0,0 +1,177 @@
+"""
+Single file world storage.
+
+A region file keeps every chunk of a world in one file::
+
+    header   magic | version | capacity | count
+    index    capacity * (chunk index | length | offset)
+    payload  encoded chunks, appended one after another
+
+The file is read through ``mmap`` so loading a chunk is an index lookup
+and a slice, without opening a file per chunk.
+"""
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_HEADER = struct.Struct("<4sHHII")
+_ENTRY = struct.Struct("<iIQ")
+
+MAGIC = b"BXRG"
+VERSION = 1
+
+
+class RegionFileError(Exception):
+    pass
+
+
+class RegionFile:
+    """Chunk payloads stored in one memory mapped file, indexed by chunk index"""
+
+    def __init__(self, path: Path, capacity: int = 128):
+        """
+        :param path: Path of the region file, created if missing
+        :param int capacity: Number of index slots for a new file
+        """
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        # chunk index -> (slot, offset, length)
+        self._index: Dict[int, Tuple[int, int, int]] = {}
+        self._capacity = 0
+        self._fd = None
+        self._mm: Optional[mmap.mmap] = None
+
+        if not self.path.exists():
+            self._create(self.path, capacity, [])
+        self._open()
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self):
+        return f"RegionFile[{self.path.name}, {len(self)} chunks]"
+
+    @property
+    def indices(self) -> List[int]:
+        return sorted(self._index)
+
+    @property
+    def size(self) -> int:
+        """Size of the file in bytes"""
+        with self._lock:
+            return os.fstat(self._fd.fileno()).st_size
+
+    @property
+    def dead_bytes(self) -> int:
+        """Bytes taken by payloads that have since been overwritten"""
+        with self._lock:
+            used = sum(length for _, _, length in self._index.values())
+            return self.size - self._data_start(self._capacity) - used
+
+    def read(self, index: int) -> Optional[bytes]:
+        """Payload of a chunk, None if the chunk is not stored"""
+        with self._lock:
+            entry = self._index.get(index)
+            if entry is None:
+                return None
+            _, offset, length = entry
+            if offset + length > len(self._mm):
+                self._remap()
+            return self._mm[offset:offset + length]
+
+    def write(self, index: int, payload: bytes) -> None:
+        """Append a payload and point the index at it"""
+        self.write_many([(index, payload)])
+
+    def write_many(self, items: Iterable[Tuple[int, bytes]]) -> None:
+        """Append several payloads, updating the index once per chunk"""
+        with self._lock:
+            for index, payload in items:
+                new = index not in self._index
+                if new and len(self._index) == self._capacity:
+                    self._grow()
+
+                self._fd.seek(0, os.SEEK_END)
+                offset = self._fd.tell()
+                self._fd.write(payload)
+
+                slot = len(self._index) if new else self._index[index][0]
+                self._index[index] = (slot, offset, len(payload))
+                self._fd.seek(_HEADER.size + slot * _ENTRY.size)
+                self._fd.write(_ENTRY.pack(index, len(payload), offset))
+                if new:
+                    self._write_header()
+            self._fd.flush()
+
+    def compact(self, capacity: Optional[int] = None) -> None:
+        """Rewrite the file without overwritten payloads"""
+        with self._lock:
+            capacity = max(capacity or self._capacity, len(self._index))
+            items = [(index, self.read(index)) for index in sorted(self._index)]
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            self._close()
+            self._create(tmp_path, capacity, items)
+            os.replace(tmp_path, self.path)
+            self._open()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    @staticmethod
+    def _data_start(capacity: int) -> int:
+        return _HEADER.size + capacity * _ENTRY.size
+
+    @classmethod
+    def _create(cls, path: Path, capacity: int, items: List[Tuple[int, bytes]]) -> None:
+        offset = cls._data_start(capacity)
+        entries = bytearray(capacity * _ENTRY.size)
+        for slot, (index, payload) in enumerate(items):
+            _ENTRY.pack_into(entries, slot * _ENTRY.size, index, len(payload), offset)
+            offset += len(payload)
+
+        with open(path, "wb") as fd:
+            fd.write(_HEADER.pack(MAGIC, VERSION, 0, capacity, len(items)))
+            fd.write(entries)
+            for _, payload in items:
+                fd.write(payload)
+
+    def _open(self) -> None:
+        self._fd = open(self.path, "r+b")
+        magic, version, _, capacity, count = _HEADER.unpack(self._fd.read(_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            self._fd.close()
+            raise RegionFileError(f"{self.path} is not a version {VERSION} region file")
+
+        self._capacity = capacity
+        entries = self._fd.read(count * _ENTRY.size)
+        self._index = {}
+        for slot, (index, length, offset) in enumerate(_ENTRY.iter_unpack(entries)):
+            self._index[index] = (slot, offset, length)
+        self._remap()
+
+    def _remap(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+        self._mm = mmap.mmap(self._fd.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _write_header(self) -> None:
+        self._fd.seek(0)
+        self._fd.write(_HEADER.pack(MAGIC, VERSION, 0, self._capacity, len(self._index)))
+
+    def _grow(self) -> None:
+        self.compact(self._capacity * 2)
+
+    def _close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._fd is not None:
+            self._fd.close()
+            self._fd = None
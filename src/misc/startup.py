@@ -0,0 +1,120 @@
+"""
+Startup profiling. Times every module import until the menu is up, named
+asset loads and marks such as the first menu frame and the first playable
+frame, all relative to when this module was imported. Only imports the
+standard library, so it can be enabled before anything heavy is imported::
+
+    python src/game.py --profile-startup
+"""
+import builtins
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import config
+
+
+class StartupProfiler:
+    """Import, asset and milestone times of one start of the game"""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.enabled = False
+        self.timing_imports = False
+        # Every report of one start overwrites the same file
+        self.path: Optional[Path] = None
+        # Module name to (cumulative, self) seconds
+        self.imports: Dict[str, Tuple[float, float]] = {}
+        self.assets: Dict[str, float] = {}
+        self.marks: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._import = builtins.__import__
+
+    def enable(self):
+        """Start profiling and timing imports, only those after this call are seen"""
+        if self.enabled:
+            return
+        self.enabled = self.timing_imports = True
+        builtins.__import__ = self._timed_import
+
+    def stop_imports(self):
+        """Stop timing imports, marks and assets are still recorded"""
+        if not self.timing_imports:
+            return
+        self.timing_imports = False
+        builtins.__import__ = self._import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._import(name, globals, locals, fromlist, level)
+        # Time spent in nested imports, per thread, to tell self time apart
+        stack: List[float] = self._local.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+        start = perf_counter()
+        try:
+            return self._import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self._lock:
+                self.imports[name] = (elapsed, elapsed - nested)
+
+    @contextmanager
+    def asset(self, name: str) -> Iterator[None]:
+        """Time loading an asset, from any thread"""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.assets[name] = self.assets.get(name, 0.0) + perf_counter() - start
+
+    def mark(self, name: str):
+        """Note when a milestone was first reached"""
+        with self._lock:
+            self.marks.setdefault(name, perf_counter() - self.started)
+
+    def as_dict(self, top: int = 25) -> Dict:
+        with self._lock:
+            slowest = sorted(self.imports.items(), key=lambda item: -item[1][0])[:top]
+            return {
+                "marks_ms": {name: seconds * 1000 for name, seconds in self.marks.items()},
+                "assets_ms": {name: seconds * 1000 for name, seconds in self.assets.items()},
+                "imports_ms": {
+                    name: {"cumulative": cumulative * 1000, "self": own * 1000}
+                    for name, (cumulative, own) in slowest
+                },
+            }
+
+    def report(self, path: Optional[Path] = None) -> Path:
+        """Print the breakdown and write it to a JSON file, the same one every time unless given"""
+        summary = self.as_dict()
+        print("Startup, ms since launch")
+        for name, ms in summary["marks_ms"].items():
+            print(f"  {name:<40}{ms:>10.1f}")
+        print("Assets, ms")
+        for name, ms in summary["assets_ms"].items():
+            print(f"  {name:<40}{ms:>10.1f}")
+        print(f"  {'module':<40}{'cumul ms':>10}{'self ms':>10}")
+        for name, times in summary["imports_ms"].items():
+            print(f"  {name:<40}{times['cumulative']:>10.1f}{times['self']:>10.1f}")
+
+        if path is None:
+            if self.path is None:
+                self.path = config.DATA_DIR / f"startup-{time.strftime('%Y%m%d-%H%M%S')}.json"
+            path = self.path
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(json.dumps(summary, indent=2))
+        print(f"Startup profile written to {path}")
+        return path
+
+
+STARTUP = StartupProfiler()
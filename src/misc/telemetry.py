@@ -0,0 +1,123 @@
+import threading
+from bisect import bisect_left
+from collections import deque
+from time import perf_counter
+from typing import Deque, Dict, Optional, Sequence
+
+from utils import percentiles
+
+
+class Histogram:
+    """Sample counts per bucket. The last bucket holds everything above the last bound."""
+
+    def __init__(self, bounds: Sequence[float]):
+        """
+        :param bounds: Upper bounds of the buckets, ascending
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+
+    def add(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+
+    def as_dict(self) -> Dict[str, int]:
+        buckets = {f"<={bound:g}": count for bound, count in zip(self.bounds, self.counts)}
+        buckets[f">{self.bounds[-1]:g}"] = self.counts[-1]
+        return buckets
+
+
+class LoaderTelemetry:
+    """
+    Metrics of the chunk loading pipeline, recorded from the loader threads
+    and the main thread.
+
+    Every chunk passes these stages, timed in milliseconds:
+
+    * queue_wait: requested until a loader thread picks it up
+    * load: read or generated, and decoded
+    * handoff: decoded until the main thread starts making its sprites
+    * sprites: first until last sprite made, spread over frames
+    * total: requested until integrated into the world
+    """
+    STAGES = ("queue_wait", "load", "handoff", "sprites", "total")
+
+    def __init__(self, samples: int, bounds_ms: Sequence[float], throughput_window: float):
+        """
+        :param int samples: Recent samples kept per stage and queue
+        :param bounds_ms: Histogram bucket bounds in milliseconds
+        :param float throughput_window: Seconds of completed loads the throughput is measured over
+        """
+        self._lock = threading.Lock()
+        self._samples = {stage: deque(maxlen=samples) for stage in self.STAGES}
+        self._histograms = {stage: Histogram(bounds_ms) for stage in self.STAGES}
+        self._depths: Dict[str, Deque[int]] = {
+            name: deque(maxlen=samples) for name in ("queue_in", "queue_out", "materializing")
+        }
+        self._loaded_at: Deque[float] = deque()
+        self._throughput_window = throughput_window
+
+        self.loaded = 0
+        self.integrated = 0
+        self.failed = 0
+        self.last_error: Optional[str] = None
+
+    def record(self, stage: str, seconds: float):
+        """Add one timing of a stage"""
+        with self._lock:
+            self._samples[stage].append(seconds * 1000)
+            self._histograms[stage].add(seconds * 1000)
+            if stage == "total":
+                self.integrated += 1
+
+    def record_loaded(self):
+        """Count a chunk a loader thread finished"""
+        now = perf_counter()
+        with self._lock:
+            self.loaded += 1
+            self._loaded_at.append(now)
+            while self._loaded_at[0] < now - self._throughput_window:
+                self._loaded_at.popleft()
+
+    def record_failure(self, error: BaseException):
+        with self._lock:
+            self.failed += 1
+            self.last_error = repr(error)
+
+    def record_depths(self, queue_in: int, queue_out: int, materializing: int):
+        """Sample the queue sizes, once per frame"""
+        with self._lock:
+            self._depths["queue_in"].append(queue_in)
+            self._depths["queue_out"].append(queue_out)
+            self._depths["materializing"].append(materializing)
+
+    @property
+    def chunks_per_second(self) -> float:
+        """Chunks loaded per second over the throughput window"""
+        with self._lock:
+            recent = sum(1 for loaded_at in self._loaded_at if loaded_at >= perf_counter() - self._throughput_window)
+        return recent / self._throughput_window
+
+    def stage_percentiles(self, stage: str) -> Dict[str, float]:
+        with self._lock:
+            return percentiles(self._samples[stage])
+
+    def as_dict(self) -> Dict:
+        """Everything recorded, as plain data"""
+        chunks_per_second = self.chunks_per_second
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "integrated": self.integrated,
+                "failed": self.failed,
+                "last_error": self.last_error,
+                "chunks_per_second": chunks_per_second,
+                "stages_ms": {
+                    stage: {**percentiles(samples), "histogram": self._histograms[stage].as_dict()}
+                    for stage, samples in self._samples.items()
+                },
+                "depths": {
+                    name: {"current": depths[-1] if depths else 0, "max": max(depths, default=0), **percentiles(depths)}
+                    for name, depths in self._depths.items()
+                },
+                "depth_series": {name: list(depths) for name, depths in self._depths.items()},
+            }
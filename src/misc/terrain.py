@@ -1,9 +1,10 @@
-from collections import deque
+import os
 from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
 from functools import cache
+from itertools import repeat
 from math import ceil, floor
-from random import choice, choices, randint
-from typing import Deque, Dict, Tuple
+from typing import Dict, List, Tuple
 
 import numpy as np
 
@@ -11,6 +12,9 @@ import config
 from constants import BiomeConstants, BlockConstants
 from utils import TArray
 
+# Weights of the vein lengths picked for every ore
+_RUN_WEIGHTS = (0.3, 0.3, 0.1, 0.1, 0.08, 0.09, 0.03)
+
 
 @cache
 def _tree(tree_type: int, jungle: bool = False) -> np.ndarray:
@@ -28,14 +32,14 @@ def _tree(tree_type: int, jungle: bool = False) -> np.ndarray:
     return t
 
 
-def _volcano(volcano_w: int) -> np.ndarray:
+def _volcano(volcano_w: int, rng: np.random.Generator) -> np.ndarray:
     # Function to generate a numpy volcano
     n_factor = volcano_w / 2
     volcano_h = ceil(n_factor)
     volcano = np.zeros((volcano_h, volcano_w))
     for i in range(volcano_h):
         volcano[floor(n_factor) - i, 0 + i:volcano_w - i] = BiomeConstants.sky
-    volcano[volcano == 1] = np.random.choice([
+    volcano[volcano == 1] = rng.choice([
         BlockConstants.pumice,
         BlockConstants.basalt,
         BlockConstants.obsidian,
@@ -57,101 +61,108 @@ def _gen_empty_chunks(x_min: int, x_max: int, y_min: int, y_max: int) \
     return empty_world
 
 
-def _sky_gen(y_max: int = None) -> TArray:
+def _sky_gen(y_max: int = None, *, rng: np.random.Generator) -> TArray:
     # For generating the sky.
     y_max = config.HEIGHT_MIN + 320
     sky = TArray(np.full((16, 16), 128))
-    clouds_co_ords = np.random.randint(16, size=(14, 2))
-    sky = _placer(4, BlockConstants.clouds, clouds_co_ords, sky)
+    clouds_co_ords = rng.integers(16, size=(14, 2))
+    sky = _placer(4, BlockConstants.clouds, clouds_co_ords, sky, rng)
     sky.adv_info[(y_max, y_max - 80)] = BiomeConstants.sky
     return sky
 
 
-def _generate_upper_mine() -> TArray:
+def _generate_upper_mine(*, rng: np.random.Generator) -> TArray:
     # For generating the upper part of the mine.
     y_max = config.HEIGHT_MIN + 320
     mine = TArray(np.full((16, 16), BlockConstants.stone), 2)
 
-    dirt_co_ords = np.random.randint(16, size=(10, 2))
-    mine = _placer(randint(6, 8), BlockConstants.dirt, dirt_co_ords, mine)
+    dirt_co_ords = rng.integers(16, size=(10, 2))
+    mine = _placer(rng.integers(6, 9), BlockConstants.dirt, dirt_co_ords, mine, rng)
     mine.adv_info[(y_max - 160, y_max - 192)] = BiomeConstants.upper_mine
     return mine
 
 
-def _generate_middle_mine(y: int, biome_code: int = None) -> TArray:
+def _generate_middle_mine(y: int, biome_code: int = None, *, rng: np.random.Generator) -> TArray:
     # For generating the main part of the mine
     y_max = config.HEIGHT_MIN + 320
     mine = TArray(np.full((16, 16), BlockConstants.stone))
-    coal_co_ords = np.random.randint(16, size=(7, 2))
-    iron_co_ords = np.random.randint(16, size=(4, 2))
-    diamond_co_ords = np.random.randint(16, size=(2, 2))
+    coal_co_ords = rng.integers(16, size=(7, 2))
+    iron_co_ords = rng.integers(16, size=(4, 2))
+    diamond_co_ords = rng.integers(16, size=(2, 2))
 
     if y_max - 272 > y >= y_max - 288 or biome_code == 5:
         mine = _placer(
-            choices((6, 7, 8, 9, 10, 11, 12), (0.3, 0.3, 0.1, 0.1, 0.08, 0.09, 0.03), k=1)[0],
+            rng.choice((6, 7, 8, 9, 10, 11, 12), p=_RUN_WEIGHTS),
             BlockConstants.coal,
             coal_co_ords,
-            mine
+            mine,
+            rng
         )
         mine = _placer(
-            choices((4, 5, 6, 7, 8, 9, 10), (0.3, 0.3, 0.1, 0.1, 0.08, 0.09, 0.03), k=1)[0],
+            rng.choice((4, 5, 6, 7, 8, 9, 10), p=_RUN_WEIGHTS),
             BlockConstants.iron,
             iron_co_ords,
-            mine
+            mine,
+            rng
         )
         mine = _placer(
-            choices((2, 3, 4, 5, 6, 7, 8), (0.3, 0.3, 0.1, 0.1, 0.08, 0.09, 0.03), k=1)[0],
+            rng.choice((2, 3, 4, 5, 6, 7, 8), p=_RUN_WEIGHTS),
             BlockConstants.diamond,
             diamond_co_ords,
-            mine
+            mine,
+            rng
         )
 
         mine.adv_info[(y_max - 272, y_max - 288)] = BiomeConstants.middle_mine_3
 
     elif y_max - 192 >= y > y_max - 224 or biome_code == 3:
         mine = _placer(
-            choices((10, 11, 12, 13, 14, 15, 16), (0.3, 0.3, 0.1, 0.1, 0.08, 0.09, 0.03), k=1)[0],
+            rng.choice((10, 11, 12, 13, 14, 15, 16), p=_RUN_WEIGHTS),
             BlockConstants.coal,
             coal_co_ords,
-            mine
+            mine,
+            rng
         )
         mine = _placer(
-            choices((7, 8, 9, 10, 11, 12, 13), (0.3, 0.3, 0.1, 0.1, 0.08, 0.09, 0.03), k=1)[0],
+            rng.choice((7, 8, 9, 10, 11, 12, 13), p=_RUN_WEIGHTS),
             BlockConstants.iron,
             iron_co_ords,
-            mine
+            mine,
+            rng
         )
 
         mine.adv_info[(y_max - 192, y_max - 224)] = BiomeConstants.middle_mine_1
 
     elif y_max - 224 >= y >= y_max - 272 or biome_code == 4:
         mine = _placer(
-            choices((7, 8, 9, 10, 11, 12, 13), (0.3, 0.3, 0.1, 0.1, 0.08, 0.09, 0.03), k=1)[0],
+            rng.choice((7, 8, 9, 10, 11, 12, 13), p=_RUN_WEIGHTS),
             BlockConstants.coal,
             coal_co_ords,
-            mine
+            mine,
+            rng
         )
         mine = _placer(
-            choices((10, 11, 12, 13, 14, 15, 16), (0.3, 0.3, 0.1, 0.1, 0.08, 0.09, 0.03), k=1)[0],
+            rng.choice((10, 11, 12, 13, 14, 15, 16), p=_RUN_WEIGHTS),
             BlockConstants.iron,
             iron_co_ords,
-            mine
+            mine,
+            rng
         )
         mine.adv_info[(y_max - 224, y_max - 272)] = BiomeConstants.middle_mine_2
 
     return mine
 
 
-def _generate_lower_mine(y_min: int) -> TArray:
+def _generate_lower_mine(y_min: int, *, rng: np.random.Generator) -> TArray:
     mine = TArray(np.full((16, 16), BlockConstants.hard_stone))
     mine.adv_info[(y_min + 16, y_min)] = BiomeConstants.lower_mine
     return mine
 
 
-def _gen_forest(y: int, biome_code: int = None) -> TArray:
+def _gen_forest(y: int, biome_code: int = None, *, rng: np.random.Generator) -> TArray:
     # For generating forest biome.
     y_max = config.HEIGHT_MIN + 320
-    tree_type = choice((BlockConstants.oak_leaf, BlockConstants.timber_leaf, BlockConstants.teak_leaf))
+    tree_type = int(rng.choice((BlockConstants.oak_leaf, BlockConstants.timber_leaf, BlockConstants.teak_leaf)))
     if y_max - 128 > y >= y_max - 160 or biome_code == 8:
         biome = TArray(np.full((16, 16), BlockConstants.dirt))
         biome.adv_info[(y_max - 128, y_max - 160)] = BiomeConstants.forest_floor
@@ -160,7 +171,7 @@ def _gen_forest(y: int, biome_code: int = None) -> TArray:
         biome.adv_info[(y_max - 80, y_max - 128)] = BiomeConstants.forest_sky
 
     if y_max - 128 >= y > y_max - BlockConstants.obsidian or biome_code == 9:
-        no_of_trees = randint(2, 3)
+        no_of_trees = rng.integers(2, 4)
         for i in range(no_of_trees):
             biome[10:16, i + 2 + i * 3: i + 5 + i * 3] = _tree(tree_type)
         biome.adv_info[(y_max - 128, y_max - BlockConstants.obsidian)] = BiomeConstants.forest
@@ -168,7 +179,7 @@ def _gen_forest(y: int, biome_code: int = None) -> TArray:
     return biome
 
 
-def _gen_plain(y: int, biome_code: int = None) -> TArray:
+def _gen_plain(y: int, biome_code: int = None, *, rng: np.random.Generator) -> TArray:
     # For generating plains biome.
     y_max = config.HEIGHT_MIN + 320
     if y_max - 128 > y >= y_max - 160 or biome_code == 1:
@@ -184,7 +195,7 @@ def _gen_plain(y: int, biome_code: int = None) -> TArray:
     return biome
 
 
-def _gen_desert(y: int, biome_code: int = None) -> TArray:
+def _gen_desert(y: int, biome_code: int = None, *, rng: np.random.Generator) -> TArray:
     # For generating desert biome.
     y_max = config.HEIGHT_MIN + 320
     if y_max - 128 > y >= y_max - 160 or biome_code == 14:
@@ -195,8 +206,8 @@ def _gen_desert(y: int, biome_code: int = None) -> TArray:
         biome.adv_info[(y_max - 80, y_max - 128)] = BiomeConstants.desert_sky
 
     if y_max - 128 >= y > y_max - BlockConstants.obsidian or biome_code == 15:
-        no_of_cactus = randint(1, 5)
-        no_of_dead_bush = randint(2, 3)
+        no_of_cactus = rng.integers(1, 6)
+        no_of_dead_bush = rng.integers(2, 4)
         for i in range(no_of_dead_bush):
             biome[15:16, 1 + i * 4:2 + i * 4] = BlockConstants.dead_bush
         for i in range(no_of_cactus):
@@ -206,7 +217,7 @@ def _gen_desert(y: int, biome_code: int = None) -> TArray:
     return biome
 
 
-def _gen_volcanoes(y: int, biome_code: int = None) -> TArray:
+def _gen_volcanoes(y: int, biome_code: int = None, *, rng: np.random.Generator) -> TArray:
     # For generating volcanic biome.
     y_max = config.HEIGHT_MIN + 320
     if y_max - 128 > y >= y_max - 160 or biome_code == 17:
@@ -217,17 +228,17 @@ def _gen_volcanoes(y: int, biome_code: int = None) -> TArray:
         biome.adv_info[(y_max - 80, y_max - 128)] = BiomeConstants.volcanic_sky
 
     if y_max - 128 >= y > y_max - BlockConstants.obsidian or biome_code == 18:
-        volcano_w = choice((9, 11, 13))
-        biome[16 - floor(volcano_w / 2) - 1:16, 2:2 + volcano_w] = _volcano(volcano_w)
+        volcano_w = int(rng.choice((9, 11, 13)))
+        biome[16 - floor(volcano_w / 2) - 1:16, 2:2 + volcano_w] = _volcano(volcano_w, rng)
         biome.adv_info[(y_max - 128, y_max - BlockConstants.obsidian)] = BiomeConstants.volcano
 
     return biome
 
 
-def _gen_jungles(y: int, biome_code: int = None) -> TArray:
+def _gen_jungles(y: int, biome_code: int = None, *, rng: np.random.Generator) -> TArray:
     # For generating jungle biome.
     y_max = config.HEIGHT_MIN + 320
-    jungle_tree_type = choice((BlockConstants.mangrove_leaf, BlockConstants.mahagoni_leaf))
+    jungle_tree_type = int(rng.choice((BlockConstants.mangrove_leaf, BlockConstants.mahagoni_leaf)))
 
     if y_max - 128 > y >= y_max - 160 or biome_code == 20:
         biome = TArray(np.full((16, 16), BlockConstants.mossy_dirt))
@@ -238,116 +249,152 @@ def _gen_jungles(y: int, biome_code: int = None) -> TArray:
         biome.adv_info[(y_max - 80, y_max - 128)] = BiomeConstants.jungle_sky
 
     if y_max - 128 >= y > y_max - BlockConstants.obsidian or biome_code == 21:
-        no_of_trees = randint(1, 2)
+        no_of_trees = rng.integers(1, 3)
         for i in range(no_of_trees):
             biome[6:16, i + i * 5: i + 5 + i * 5] = _tree(jungle_tree_type, True)
         biome.adv_info[(y_max - 128, y_max - BlockConstants.obsidian)] = BiomeConstants.jungle
     return biome
 
 
-def _placer(range_: int, block_id: int, co_ords_arr: TArray, main: TArray,) -> TArray:
+def _placer(range_: int, block_id: int, co_ords_arr: np.ndarray, main: TArray, rng: np.random.Generator) -> TArray:
     # For adding chain of blocks to a chunk.
-    main_arr = main.arr
-    for co_ord_arr in co_ords_arr:
-        x_inc = 0
-        y_inc = 0
-        for _ in range(range_):
-            to_be_inc = randint(0, 1)
-            if to_be_inc == 1:
-                x_inc += 1
-            else:
-                y_inc += 1
-
-            if co_ord_arr[0] + x_inc < 16 and co_ord_arr[1] + y_inc < 16:
-                main_arr[co_ord_arr[1] + y_inc, co_ord_arr[0] + x_inc] = block_id
-
-            elif co_ord_arr[0] + x_inc < 16 and co_ord_arr[1] + y_inc > 15:
-                main_arr[co_ord_arr[1], co_ord_arr[0] + x_inc] = block_id
-
-            elif co_ord_arr[0] + x_inc > 15 and co_ord_arr[1] + y_inc < 16:
-                main_arr[co_ord_arr[1] + y_inc, co_ord_arr[0]] = block_id
-    main.arr = main_arr
+    # Every vein walks range_ steps right or up from its start, all veins are walked at once.
+    # A step that leaves the chunk in one direction is placed back on the start row or column.
+    x_start = co_ords_arr[:, 0, None]
+    y_start = co_ords_arr[:, 1, None]
+    steps = rng.integers(2, size=(len(co_ords_arr), range_))
+    x = x_start + np.cumsum(steps, axis=1)
+    y = y_start + np.cumsum(1 - steps, axis=1)
+
+    x_inside = x < 16
+    y_inside = y < 16
+    placed = x_inside | y_inside
+    x = np.where(x_inside, x, x_start)[placed]
+    y = np.where(y_inside, y, y_start)[placed]
+    main.arr[y, x] = block_id
     return main
 
 
-def gen_world(x_min: int = -192, x_max: int = 192, y_min: int = -160, y_max: int = 160
-              ) -> Dict[Tuple[int, ...], TArray]:
-    """When called without any arguments it generates the initial world.
-    Call with Arguments to generate or load more world. Also please keep the difference of y_min and y_max 320.
-    :param x_min: The x-axis point from where it has to generate the world.
-    :param x_max: The x-axis point till where it will generate the world.
-    :param y_min: The y-axis point from where it has to generate the world.
-    :param y_max: The y-axis point till where it will generate the world.
-    """
-    world = _gen_empty_chunks(x_min, x_max, y_min, y_max)
-    free_chunks_horizontal = int((abs(x_min) + abs(x_max)) / 16)
-    no_of_biomes = randint(2, 4)
+def _biome_at(index: int, seed: int) -> Callable[..., TArray]:
+    # Biome generator of a column. Columns are grouped in biome areas that pick a biome each.
+    area = index // config.BIOME_COLUMNS
     biomes_choices = [_gen_forest, _gen_plain, _gen_desert, _gen_volcanoes, _gen_jungles]
-    biomes_nf = deque()
-    biomes_area = deque()
-    for _ in range(no_of_biomes):
-        biome = choice(biomes_choices)
-        if biome not in biomes_nf:
-            biomes_nf.append(biome)
-            biomes_area.append(int(free_chunks_horizontal / no_of_biomes) * 5)
-        else:
-            i = biomes_nf.index(biome)
-            biomes_area[i] += int(free_chunks_horizontal / no_of_biomes) * BiomeConstants.middle_mine_3
+    rng = np.random.default_rng([seed, area % 2 ** 32, 1])
+    return biomes_choices[rng.integers(len(biomes_choices))]
 
-    biomes = dict(enumerate([deque(elem) for elem in zip(biomes_area, biomes_nf)]))
-    biomes: Dict[int, Deque[int, Callable[[int], int]], TArray]
-    i = 0
-    for co_ords, _ in world.items():
+
+def _column_rng(seed: int, index: int) -> np.random.Generator:
+    # Every column gets its own generator so it can be generated on its own.
+    return np.random.default_rng([seed, index % 2 ** 32])
+
+
+def _gen_column(biome_gen: Callable[..., TArray], y_min: int, y_max: int, rng: np.random.Generator
+                ) -> List[Tuple[int, TArray]]:
+    # Generates the sub-chunks of one column from the bottom up.
+    column = []
+    for y in range(y_min, y_max, 16):
         # generating sky
-        if co_ords[3] >= y_max - 80:
-            world[co_ords] = _sky_gen()
+        if y >= y_max - 80:
+            sub_chunk = _sky_gen(rng=rng)
 
         # generating upper mine
-        elif y_max - 160 > co_ords[3] >= y_max - 192:
-            world[co_ords] = _generate_upper_mine()
+        elif y_max - 160 > y >= y_max - 192:
+            sub_chunk = _generate_upper_mine(rng=rng)
 
         # generating middle mine
-        elif y_max - 192 > co_ords[3] >= y_max - 288:
-            world[co_ords] = _generate_middle_mine(co_ords[3])
+        elif y_max - 192 > y >= y_max - 288:
+            sub_chunk = _generate_middle_mine(y, rng=rng)
 
         # generating lower mine
-        elif co_ords[3] <= y_min + 16:
-            world[co_ords] = _generate_lower_mine(y_min)
+        elif y <= y_min + 16:
+            sub_chunk = _generate_lower_mine(y_min, rng=rng)
 
         # generating biomes
         else:
-            if biomes[i][0] != 0:
-                pass
-            else:
-                if len(biomes) - 1 > i:
-                    i += 1
-
-            biome_gen: Callable[[int], int] = biomes[i][1]
-            # biomes[i][1]: Callable[[int, int], TArray]
-
-            if biomes[i][1] == _gen_forest:
-                world[co_ords] = biome_gen(co_ords[3])
-            elif biomes[i][1] == _gen_jungles:
-                world[co_ords] = biome_gen(co_ords[3])
-            else:
-                world[co_ords] = biome_gen(co_ords[3])
-            biomes[i][0] -= 1
+            sub_chunk = biome_gen(y, rng=rng)
+        column.append((y, sub_chunk))
+    return column
+
+
+def _column_blocks(column: List[Tuple[int, TArray]]) -> np.ndarray:
+    # Stacks sub-chunks the same way HorizontalChunk does, rows from the bottom up.
+    return np.concatenate([np.flip(sub_chunk.arr) for _, sub_chunk in column]).astype(np.uint8)
+
+
+def _gen_strip(indices: List[int], y_min: int, y_max: int, seed: int) -> np.ndarray:
+    # Generates a strip of neighbouring columns as one (columns, height, width) block array.
+    return np.stack([gen_chunk(index, seed, y_min, y_max) for index in indices])
+
+
+def gen_world(x_min: int = -192, x_max: int = 192, y_min: int = -160, y_max: int = 160, seed: int = None
+              ) -> Dict[Tuple[int, ...], TArray]:
+    """When called without any arguments it generates the initial world.
+    Call with Arguments to generate or load more world. Also please keep the difference of y_min and y_max 320.
+    :param x_min: The x-axis point from where it has to generate the world.
+    :param x_max: The x-axis point till where it will generate the world.
+    :param y_min: The y-axis point from where it has to generate the world.
+    :param y_max: The y-axis point till where it will generate the world.
+    :param seed: Seed of the world, a random one when not given.
+    """
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    world = _gen_empty_chunks(x_min, x_max, y_min, y_max)
+
+    for x in range(x_min, x_max, 16):
+        index = x // 16
+        for y, sub_chunk in _gen_column(_biome_at(index, seed), y_min, y_max, _column_rng(seed, index)):
+            world[(x + 16, x, y + 16, y)] = sub_chunk
 
     return world
 
 
-def gen_chunk(y: int, biome_code: int):
-    biomes = [_gen_forest, _gen_plain, _gen_desert, _gen_volcanoes, _gen_jungles]
-    if biome_code / 3 - 2 > 0:
-        return biomes[biome_code // 3 - 2](y, biome_code=biome_code)
+def gen_world_parallel(x_min: int, x_max: int, y_min: int, y_max: int, seed: int = None, workers: int = None
+                       ) -> Dict[int, np.ndarray]:
+    """Generate the world in worker processes, a strip of columns at a time.
+    Every column is seeded from the world seed and its chunk index, so the world is the same
+    as :func:`gen_world` makes for that seed whatever the number of workers.
+    :param x_min: The x-axis point from where it has to generate the world.
+    :param x_max: The x-axis point till where it will generate the world.
+    :param y_min: The y-axis point from where it has to generate the world.
+    :param y_max: The y-axis point till where it will generate the world.
+    :param seed: Seed of the world, a random one when not given.
+    :param workers: Number of processes. When not given one per core, or none at all below
+        ``WORLD_GEN_PARALLEL_COLUMNS`` columns.
+    :return: (height, 16) uint8 block arrays keyed by chunk index, rows from the bottom up.
+    """
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    indices = [x // 16 for x in range(x_min, x_max, 16)]
+    if not indices:
+        return {}
+    if not workers:
+        workers = (os.cpu_count() or 1) if len(indices) >= config.WORLD_GEN_PARALLEL_COLUMNS else 1
+
+    # A few strips per worker to even out the load
+    size = ceil(len(indices) / (workers * 2))
+    strips = [indices[i:i + size] for i in range(0, len(indices), size)]
+    args = (strips, repeat(y_min), repeat(y_max), repeat(seed))
+
+    if workers == 1:
+        results = list(map(_gen_strip, *args))
     else:
-        biomes = [_sky_gen, _generate_upper_mine, _generate_lower_mine]
-        if biome_code in (3, 4, 5):
-            return _generate_middle_mine(y, biome_code=biome_code)
-        elif biome_code == 6:
-            return biomes[2](config.HEIGHT_MIN)
-        else:
-            return biomes[biome_code - 1](config.HEIGHT_MIN + 320)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_gen_strip, *args))
+
+    return {index: blocks for strip, result in zip(strips, results) for index, blocks in zip(strip, result)}
+
+
+def gen_chunk(index: int, seed: int, y_min: int = config.HEIGHT_MIN, y_max: int = config.HEIGHT_MIN + 320
+              ) -> np.ndarray:
+    """Generate one chunk column on its own. Any chunk of an endless world can be made this way
+    and comes out the same as when it is generated together with its neighbours.
+    :param index: Chunk index of the column.
+    :param seed: Seed of the world.
+    :param y_min: The y-axis point from where it has to generate the column.
+    :param y_max: The y-axis point till where it will generate the column.
+    :return: (height, 16) uint8 block array, rows from the bottom up.
+    """
+    return _column_blocks(_gen_column(_biome_at(index, seed), y_min, y_max, _column_rng(seed, index)))
 
 
 if __name__ == '__main__':
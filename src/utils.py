@@ -1,7 +1,13 @@
+from math import ceil
 from time import perf_counter
+from typing import TYPE_CHECKING, Dict, Iterable, Sequence
 
-import numpy as np
-import numpy.typing as npt
+import config
+
+if TYPE_CHECKING:
+    # Only for annotations, numpy is not needed to show the menu
+    import numpy as np
+    import numpy.typing as npt
 
 
 class WorldLoadingException(Exception):
@@ -22,8 +28,21 @@ class Timer:
         print(f"Timer: {self.name} {perf_counter() - self.time_start}")
 
 
+def world_to_cell(position: float) -> int:
+    """Grid cell holding a world position, cells are centered on multiples of the sprite size"""
+    return int((position + config.SPRITE_PIXEL_SIZE // 2) // config.SPRITE_PIXEL_SIZE)
+
+
+def percentiles(samples: Iterable[float], ranks: Sequence[int] = (50, 95, 99)) -> Dict[str, float]:
+    """Nearest rank percentiles of samples, keyed p50, p95 ... and 0 without samples"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {f"p{rank}": 0.0 for rank in ranks}
+    return {f"p{rank}": ordered[max(0, ceil(rank / 100 * len(ordered)) - 1)] for rank in ranks}
+
+
 class TArray:
-    def __init__(self, arr: npt.NDArray[np.int_], info: int = None):
+    def __init__(self, arr: "npt.NDArray[np.int_]", info: int = None):
         self.arr = arr
         self.info = info
         self.adv_info = {}
@@ -1,21 +1,28 @@
-import gzip
-import pickle
+import heapq
+import itertools
+import random
 import threading
-import time
 from collections import deque
-from math import atan, pi
+from math import atan, ceil, floor, pi
 from queue import Empty, Queue
-from typing import Optional, Set, Tuple
+from time import perf_counter
+from typing import (Callable, Deque, Dict, Iterable, Iterator, List,
+                    NamedTuple, Optional, Set, Tuple, Union,)
 
 import arcade
 
 import config
-from block.block import Block
+from block.block import BlockRecord
 from entities.player import Player, PlayerSpriteList
+from misc.cache import ChunkCache
 from misc.camera import CustomCamera
 from misc.chunk import HorizontalChunk
-from misc.terrain import gen_world
-from utils import Timer
+from misc.physics import TileGridPhysics
+from misc.profiler import PROFILER
+from misc.region import RegionFile
+from misc.telemetry import LoaderTelemetry
+from misc.terrain import gen_chunk, gen_world_parallel
+from utils import Timer, percentiles, world_to_cell
 
 
 class World:
@@ -46,23 +53,56 @@ class World:
         self._player_list: PlayerSpriteList = PlayerSpriteList(self._player_sprite)
 
         # Initial physics engine with no chunks
-        self._physics_engine: arcade.PhysicsEnginePlatformer = arcade.PhysicsEnginePlatformer(
-            player_sprite=self._player_sprite,
-            walls=[],
-            gravity_constant=config.GRAVITY,
-        )
+        self._physics_engine: Union[arcade.PhysicsEnginePlatformer, TileGridPhysics]
+        if config.TILE_PHYSICS:
+            self._physics_engine = TileGridPhysics(
+                player_sprite=self._player_sprite,
+                get_chunk=lambda index: self._whole_world.peek(index),
+                gravity_constant=config.GRAVITY,
+            )
+        else:
+            self._physics_engine = arcade.PhysicsEnginePlatformer(
+                player_sprite=self._player_sprite,
+                walls=[],
+                gravity_constant=config.GRAVITY,
+            )
         self._player_sprite.physics_engine = self._physics_engine
 
-        # All chunks
-        self._whole_world: dict = dict()
-        # Visible chunks
-        self._active_chunks: deque = deque()
-
         self.camera = CustomCamera()
 
+        # World storage
+        config.DATA_DIR.mkdir(exist_ok=True)
+        self._region = RegionFile(config.DATA_DIR / f"{name}{HorizontalChunk.FORMAT_VERSION}.region")
+        self._seed = self._load_seed()
+
         # Chunk loader
-        self._chunk_loader = ChunkLoader()
+        self._chunk_loader = ChunkLoader(self._region, self._seed, workers=config.CHUNK_LOADER_WORKERS)
         self._requested_chunks: Set[int] = set()  # Keep track of requested chunks
+        self._request_center: Optional[int] = None  # Player chunk the requests are prioritized around
+
+        # Loaded chunks getting their sprites made a slice of each frame at a time
+        self._materializing: Dict[int, Materializing] = {}
+        # When loading a chunk last failed, it is not requested again for a while
+        self._failed_at: Dict[int, float] = {}
+        self._frame = 0
+        # Chunks the loading screen waits for, see spawn_chunks
+        self._spawn_chunks: List[int] = []
+        self._frames_to_visible: Deque[int] = deque(maxlen=config.CHUNK_LOADER_SAMPLES)
+
+        # Writes edited chunks back to the region file
+        self._chunk_writer = ChunkWriter(self._region, config.SAVE_INTERVAL)
+
+        # Loaded chunks
+        self._whole_world: ChunkCache = ChunkCache(
+            config.CHUNK_CACHE_SPRITES,
+            config.CHUNK_CACHE_SIZE,
+            flush=self._chunk_writer.flush,
+        )
+        # Visible chunks
+        self._active_chunks: deque = deque()
+        # Sections drawn and handed to the physics engine, as (start, stop)
+        self._draw_sections: Tuple[int, int] = (0, 0)
+        self._wall_sections: Optional[Tuple[int, int]] = None
 
     @property
     def player(self) -> Player:
@@ -71,46 +111,273 @@ class World:
     def draw(self):
         self.camera.use()
 
-        for chunk in self._active_chunks:
-            chunk.draw()
+        with PROFILER.phase("draw_chunks"):
+            for chunk in self._active_chunks:
+                chunk.draw(*self._draw_sections)
 
-        self._player_list.draw()
-        self.debug_draw_chunks()
+        with PROFILER.phase("draw_player"):
+            self._player_list.draw()
+        with PROFILER.phase("draw_debug"):
+            self.debug_draw_chunks()
 
     def update(self):
         """Called every frame to update the world state"""
-        self.camera.center_camera_to_player(self._player_sprite)
-        self.update_visible_chunks()
-        self.process_new_chunks()
+        with PROFILER.phase("camera"):
+            self.camera.center_camera_to_player(self._player_sprite)
+        with PROFILER.phase("chunk_requests"):
+            self.update_chunk_requests()
+        with PROFILER.phase("visible_chunks"):
+            self.update_visible_chunks()
+        with PROFILER.phase("new_chunks"):
+            self.process_new_chunks()
+        with PROFILER.phase("sections"):
+            self.update_sections()
 
         if self._player_sprite.center_y < -100:
             self._player_sprite.position = (self._player_default_x, self._player_default_y)
 
-        self._physics_engine.update()
-        self._player_list.update_list()
+        with PROFILER.phase("physics"):
+            self._physics_engine.update()
+        with PROFILER.phase("update_list"):
+            self._player_list.update_list()
 
     def create(self):
         """Create the initial world state"""
         self.setup_world()
+        self._chunk_writer.start()
+
+    def shutdown(self):
+        """Write all pending edits to disk"""
+        self._chunk_writer.close()
+
+    @property
+    def save_stats(self) -> Dict[str, float]:
+        """Pending dirty chunks and flush latency of the chunk writer"""
+        return self._chunk_writer.stats
+
+    @property
+    def loader_stats(self) -> Dict[str, float]:
+        """
+        Queued requests, failures, throughput, queue wait and load time percentiles
+        of the chunk loader and percentiles of the frames a loaded chunk takes to
+        get all its sprites
+        """
+        return {
+            **self._chunk_loader.stats,
+            "materializing": len(self._materializing),
+            **{f"frames_to_visible_{k}": v for k, v in percentiles(self._frames_to_visible).items()},
+        }
+
+    @property
+    def loader_telemetry(self) -> Dict:
+        """
+        Everything recorded about chunk loading: stage latency percentiles and
+        histograms, queue depths per frame, throughput and failures.
+        See :class:`misc.telemetry.LoaderTelemetry` for the stages.
+        """
+        return {
+            **self._chunk_loader.telemetry.as_dict(),
+            "frames_to_visible": percentiles(self._frames_to_visible),
+        }
+
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """Hits, misses and evictions of the chunk cache"""
+        return self._whole_world.stats
+
+    def process_new_chunks(self, budget: float = config.CHUNK_INTEGRATION_BUDGET):
+        """
+        Make sprites for loaded chunks until the frame's integration budget is spent
+
+        :param float budget: Seconds of this frame to spend
+        """
+        self._frame += 1
+        loader = self._chunk_loader
+        telemetry = loader.telemetry
+        telemetry.record_depths(loader.queued, loader.queue_out.qsize(), len(self._materializing))
 
-    def process_new_chunks(self):
         # Get loaded chunks from threaded chunk loader
-        self._chunk_loader.start()
-        new_chunks = self._chunk_loader.get_loaded_chunks(max_results=1)
-        for chunk in new_chunks:
-            print("New chunk data processed", type(chunk))
-            self._requested_chunks.remove(chunk.index)
-            self._whole_world[chunk.index] = chunk
+        loader.start()
+        new_walls = False
+        for result in loader.get_loaded_chunks(max_results=None):
+            if result.chunk is None:
+                # Counted by the loader, requested again after a delay if still needed
+                self._requested_chunks.discard(result.chunk_id)
+                self._failed_at[result.chunk_id] = perf_counter()
+                continue
+            chunk = result.chunk
+            new_walls |= self._link_neighbours(chunk)
+            self._materializing[chunk.index] = Materializing(
+                chunk, chunk.make_sprite_list(), self._frame, result.requested_at, result.decoded_at,
+            )
+        if new_walls:
+            self.update_sections(force=True)
+
+        timer = Timer("chunk_integration")
+        new_chunks = False
+        while self._materializing and timer.stop() < budget:
+            # Chunks closest to the player first
+            center = self._player_sprite.chunk
+            index = min(self._materializing, key=lambda i: abs(i - center))
+            item = self._materializing[index]
+            if item.started_at is None:
+                item = self._materializing[index] = item._replace(started_at=perf_counter())
+                telemetry.record("handoff", item.started_at - item.decoded_at)
+            for _ in item.sprites:
+                if timer.stop() >= budget:
+                    break
+            else:
+                done_at = perf_counter()
+                telemetry.record("sprites", done_at - item.started_at)
+                telemetry.record("total", done_at - item.requested_at)
+                del self._materializing[index]
+                self._requested_chunks.discard(index)
+                self._whole_world[index] = item.chunk
+                self._frames_to_visible.append(self._frame - item.arrived_frame + 1)
+                new_chunks = True
+
+        if new_chunks:
+            self._whole_world.evict({chunk.index for chunk in self._active_chunks})
+
+    def _loaded_chunk(self, index: int) -> Optional[HorizontalChunk]:
+        """A cached chunk, or one still getting its sprites"""
+        chunk = self._whole_world.peek(index)
+        if chunk is None and index in self._materializing:
+            chunk = self._materializing[index].chunk
+        return chunk
+
+    def _link_neighbours(self, chunk: HorizontalChunk) -> bool:
+        """
+        Exchange edge columns with the loaded chunks beside a chunk, for its collision layer
+
+        :return: True if a new collision sprite list was made
+        """
+        new_walls = False
+        if config.TILE_PHYSICS:
+            return new_walls
+        for side in (-1, 1):
+            neighbour = self._loaded_chunk(chunk.index + side)
+            if neighbour is not None:
+                new_walls |= chunk.set_neighbour_edge(side, neighbour.edge(-side))
+                new_walls |= neighbour.set_neighbour_edge(-side, chunk.edge(side))
+        return new_walls
+
+    def _edge_edited(self, chunk: HorizontalChunk, cell_x: int) -> bool:
+        """
+        Hand an edited edge column to the chunk beside it
+
+        :return: True if a new collision sprite list was made
+        """
+        column = cell_x % config.CHUNK_WIDTH
+        side = -1 if column == 0 else 1 if column == config.CHUNK_WIDTH - 1 else 0
+        if side and not config.TILE_PHYSICS:
+            neighbour = self._loaded_chunk(chunk.index + side)
+            if neighbour is not None:
+                return neighbour.set_neighbour_edge(-side, chunk.edge(side))
+        return False
 
     def request_chunk(self, chunk_id: int):
         """Request a new chunk"""
         # Ensure we don't request the same chunk multiple times
         if chunk_id in self._requested_chunks:
             return
+        failed_at = self._failed_at.get(chunk_id)
+        if failed_at is not None and perf_counter() - failed_at < config.CHUNK_RETRY_DELAY:
+            return
 
-        print("Requesting new chunk", chunk_id)
-        self._chunk_loader.queue_in.put(chunk_id)
         self._requested_chunks.add(chunk_id)
+        # Counted as a miss, or as a rebuild when only the sprites are gone
+        cached = self._whole_world.get(chunk_id)
+        if cached is not None:
+            # Still cached without sprites, only the sprites need to be made again
+            if self._link_neighbours(cached):
+                self.update_sections(force=True)
+            now = perf_counter()
+            self._materializing[chunk_id] = Materializing(cached, cached.make_sprite_list(), self._frame, now, now)
+        else:
+            self._chunk_loader.request(chunk_id, priority=abs(chunk_id - self._player_sprite.chunk))
+
+    def spawn_chunks(self) -> List[int]:
+        """
+        Chunks loaded before the player can start: every chunk visible from the
+        player and the one past each edge, which ``update_visible_chunks`` loads
+        to find where the view ends
+        """
+        player_x = self._player_sprite.center_x
+        view_dist = config.VISIBLE_RANGE_MAX * config.SPRITE_PIXEL_SIZE
+        width = config.CHUNK_WIDTH_PIXELS
+        half = config.SPRITE_PIXEL_SIZE // 2
+        first = ceil((player_x - view_dist - width + half) / width)
+        last = floor((player_x + view_dist + half) / width)
+        return list(range(first - 1, last + 2))
+
+    def preload_spawn(self) -> List[int]:
+        """Request all spawn chunks at once, the loader threads work through them in parallel"""
+        self._spawn_chunks = self.spawn_chunks()
+        self._chunk_loader.start()
+        for chunk_id in self._spawn_chunks:
+            self.request_chunk(chunk_id)
+        return self._spawn_chunks
+
+    @property
+    def spawn_progress(self) -> float:
+        """
+        Fraction of the spawn area ready. A chunk counts half once its blocks
+        are loaded and fully once all its sprites are made.
+        """
+        if not self._spawn_chunks:
+            return 0.0
+        done = 0.0
+        for chunk_id in self._spawn_chunks:
+            chunk = self._whole_world.peek(chunk_id)
+            if chunk is not None and chunk.has_sprites:
+                done += 1
+            elif chunk is not None or chunk_id in self._materializing:
+                done += 0.5
+        return done / len(self._spawn_chunks)
+
+    def update_chunk_requests(self):
+        """Re-rank queued chunk requests when the player changes chunk, dropping those too far away"""
+        center = self._player_sprite.chunk
+        if center == self._request_center:
+            return
+        self._request_center = center
+
+        for chunk_id in list(self._requested_chunks):
+            if abs(chunk_id - center) <= config.CHUNK_CANCEL_DISTANCE:
+                continue
+            if chunk_id in self._materializing:
+                # Drop the sprites made so far, the blocks are still on disk or in the cache
+                self._materializing.pop(chunk_id).chunk.release_sprites()
+                self._requested_chunks.remove(chunk_id)
+            elif self._chunk_loader.cancel(chunk_id):
+                self._requested_chunks.remove(chunk_id)
+        self._chunk_loader.reprioritize(lambda chunk_id: abs(chunk_id - center))
+
+    def update_sections(self, force: bool = False):
+        """
+        Pick the sections overlapping the camera for drawing and the sections
+        around the player for the physics engine
+
+        :param bool force: Update the physics walls even if the player's sections are unchanged
+        """
+        size = config.SECTION_HEIGHT_PIXELS
+        bottom = self.camera.position[1]
+        self._draw_sections = (
+            int(bottom // size) - config.SECTION_MARGIN,
+            int((bottom + self.camera.viewport_height) // size) + 1 + config.SECTION_MARGIN,
+        )
+
+        if config.TILE_PHYSICS:
+            return
+
+        section = int((self._player_sprite.center_y + config.SPRITE_PIXEL_SIZE / 2) // size)
+        wall_sections = (section - config.PHYSICS_SECTION_MARGIN, section + 1 + config.PHYSICS_SECTION_MARGIN)
+        if force or wall_sections != self._wall_sections:
+            self._wall_sections = wall_sections
+            self._physics_engine.walls = [
+                sprites for chunk in self._active_chunks for sprites in chunk.sections(*wall_sections)
+            ]
 
     def update_visible_chunks(self) -> Tuple[bool, bool]:
         """Detect and update visible chunks"""
@@ -119,12 +386,13 @@ class World:
 
         # If we have no active chunks, add the chunk the player is located in
         if not self._active_chunks:
-            chunk = self._whole_world.get(self._player_sprite.chunk)
+            chunk = self._whole_world.peek(self._player_sprite.chunk)
             # If the player is not located in a chunk we have nothing to do
-            if not chunk:
+            if not chunk or not chunk.has_sprites:
                 self.request_chunk(self._player_sprite.chunk)
                 return False, False
 
+            self._whole_world.get(chunk.index)
             self._active_chunks.append(chunk)
             changed = True
 
@@ -134,28 +402,30 @@ class World:
         # Fill visible chunks from left side
         while self._active_chunks[0].is_visible(player_x, view_dist):
             index = self._active_chunks[0].index - 1
-            new_chunk = self._whole_world.get(index)
-            if not new_chunk:
+            new_chunk = self._whole_world.peek(index)
+            if not new_chunk or not new_chunk.has_sprites:
                 self.request_chunk(index)
                 visible_loaded = False
                 break
             elif not new_chunk.is_visible(player_x, view_dist):
                 break
 
+            self._whole_world.get(index)
             self._active_chunks.appendleft(new_chunk)
             changed = True
 
         # Fill visible chunks from right side
         while self._active_chunks[-1].is_visible(player_x, view_dist):
             index = self._active_chunks[-1].index + 1
-            new_chunk = self._whole_world.get(index)
-            if not new_chunk:
+            new_chunk = self._whole_world.peek(index)
+            if not new_chunk or not new_chunk.has_sprites:
                 self.request_chunk(index)
                 visible_loaded = False
                 break
             elif not new_chunk.is_visible(player_x, view_dist):
                 break
 
+            self._whole_world.get(index)
             self._active_chunks.append(new_chunk)
             changed = True
 
@@ -171,37 +441,42 @@ class World:
 
         # Update chunks for the physics engine
         if changed:
-            self._physics_engine.walls = [chunk.spritelist for chunk in self._active_chunks]
+            self.update_sections(force=True)
+            self._whole_world.evict({chunk.index for chunk in self._active_chunks})
 
         return visible_loaded, changed
 
     def setup_world(self) -> None:
-        config.DATA_DIR.mkdir(exist_ok=True)
-
-        if not (config.DATA_DIR / f"pickle{pickle.format_version}_0.pickle").exists():
-            print("World not generated. Generating ...")
+        if 0 not in self._region:
+            # Only the spawn area is made up front, the chunk loader generates the rest when needed
+            print("World not generated. Generating spawn area ...")
             timer = Timer("world_gen")
 
-            # Create empty chunks
-            for n in range(-31, 31):
-                self._whole_world[n] = HorizontalChunk(n * 16, n)
-
-            world = gen_world(-496, 496, config.HEIGHT_MIN, config.HEIGHT_MIN + 320)
-            for k, chunk_data in world.items():
-                n = int(k[1] / 16)
-                self._whole_world[n]['setter'] = chunk_data
+            world = gen_world_parallel(
+                -config.SPAWN_CHUNKS * 16, (config.SPAWN_CHUNKS + 1) * 16,
+                config.HEIGHT_MIN, config.HEIGHT_MIN + 320,
+                seed=self._seed,
+                workers=config.WORLD_GEN_WORKERS,
+            )
 
             print(f"Generated world in {timer.stop()} seconds")
 
             print("Saving world")
             timer = Timer("world_save")
-            for n, chunk in self._whole_world.items():
-                with gzip.open(config.DATA_DIR / f"pickle{pickle.format_version}_{n}.pickle", "wb") as fd:
-                    pickle.dump(chunk.data, fd)
-                    chunk.make_sprite_list()
+            self._region.write_many((n, HorizontalChunk(n * 16, n, blocks).encode()) for n, blocks in world.items())
 
             print(f"Saved wold in {timer.stop()} seconds")
 
+    def _load_seed(self) -> int:
+        """Seed of the world, picked when the world is first created"""
+        path = self._region.path.with_suffix(".seed")
+        if path.exists():
+            return int(path.read_text())
+
+        seed = config.WORLD_SEED if config.WORLD_SEED is not None else random.getrandbits(64)
+        path.write_text(str(seed))
+        return seed
+
     def debug_draw_chunks(self):
         """Draw chunk borders with lines"""
         for chunk in self._active_chunks:
@@ -222,34 +497,58 @@ class World:
 
     def get_chunk_at_world_position(self, x, _y) -> Optional[HorizontalChunk]:
         """Get a chunk at a wold position"""
-        return self._whole_world.get((x + config.SPRITE_PIXEL_SIZE / 2) // 320)
+        return self._whole_world.peek(world_to_cell(x) // config.CHUNK_WIDTH)
+
+    def _editable_chunk(self, cell_x: int) -> Optional[HorizontalChunk]:
+        """
+        Chunk holding a world cell column if all its sprites are made. Chunks still
+        getting their sprites, or with them released, are not edited: their sprites
+        are made from the block array later and would not match the edit.
+        """
+        chunk = self._whole_world.peek(cell_x // config.CHUNK_WIDTH)
+        if chunk is None or not chunk.has_sprites:
+            return None
+        return chunk
 
-    def get_block_at_world_position(self, x, y) -> Optional[Block]:
+    def get_block_at_world_position(self, x, y) -> Optional[BlockRecord]:
         """Get a block from a world position"""
-        chunk = self.get_chunk_at_world_position(x, y)
+        cell_x, cell_y = world_to_cell(x), world_to_cell(y)
+        chunk = self._editable_chunk(cell_x)
         if not chunk:
             return None
 
-        blocks = arcade.get_sprites_at_point(point=(x, y), sprite_list=chunk.spritelist)
-        if blocks:
-            return blocks[0]
-
-        return None
+        return chunk.block_at(cell_x % config.CHUNK_WIDTH, cell_y)
 
     def place_block(self, x: int, y: int):
         actual_x = config.SPRITE_PIXEL_SIZE * round(x / config.SPRITE_PIXEL_SIZE)
         actual_y = config.SPRITE_PIXEL_SIZE * round(y / config.SPRITE_PIXEL_SIZE)
+        chunk = self._editable_chunk(world_to_cell(x))
+        if chunk is None:
+            return
         block_id = self._player_sprite.inventory.get_selected_item_id_and_remove()
         if not block_id:
             return
-        self._whole_world[int((x + config.SPRITE_PIXEL_SIZE / 2) // 320)].add(actual_x, actual_y, block_id)
-
-    def remove_block(self, block: Block):
-        x = block.center_x
-        self._whole_world[int((x + config.SPRITE_PIXEL_SIZE / 2) // 320)].remove(block)
+        new_walls = chunk.add(actual_x, actual_y, block_id)
+        new_walls |= self._edge_edited(chunk, world_to_cell(x))
+        self._chunk_writer.mark_dirty(chunk)
+        # The physics engine holds the wall lists, hand it any new one
+        if new_walls:
+            self.update_sections(force=True)
+
+    def remove_block(self, block: BlockRecord) -> bool:
+        """Remove a block, False if its chunk can not be edited right now"""
+        chunk = self._editable_chunk(block.x)
+        if chunk is None:
+            return False
+        new_walls = chunk.remove(block)
+        new_walls |= self._edge_edited(chunk, block.x)
+        self._chunk_writer.mark_dirty(chunk)
+        if new_walls:
+            self.update_sections(force=True)
+        return True
 
     @property
-    def whole_world(self):
+    def whole_world(self) -> ChunkCache:
         return self._whole_world
 
     def dir_of_mouse_from_player(self, mouse_x, mouse_y):
@@ -290,7 +589,7 @@ class World:
 
         return direction
 
-    def block_break_check(self, block: Block, mouse_x: int, mouse_y: int) -> bool:
+    def block_break_check(self, block: BlockRecord, mouse_x: int, mouse_y: int) -> bool:
         if not self._player_sprite.distance_to_block(block) < config.PLAYER_BLOCK_REACH:
             return False
         reverse = {"S": "N", "N": "S", "SW": "NE", "NE": "SW", "E": "W", "W": "E", "SE": "NW", "NW": "SE"}
@@ -302,56 +601,252 @@ class World:
         return True
 
 
+class LoadRequest(NamedTuple):
+    priority: float
+    seq: int
+    chunk_id: int
+    requested_at: float
+
+
+class LoadResult(NamedTuple):
+    chunk_id: int
+    # None when loading failed
+    chunk: Optional[HorizontalChunk]
+    requested_at: float
+    decoded_at: float
+
+
+class Materializing(NamedTuple):
+    """A loaded chunk getting its sprites made"""
+    chunk: HorizontalChunk
+    sprites: Iterator
+    arrived_frame: int
+    requested_at: float
+    decoded_at: float
+    started_at: Optional[float] = None
+
+
 class ChunkLoader:
-    def __init__(self):
-        # Queue for incoming and completed work
-        self.queue_in = Queue(maxsize=-1)
+    def __init__(self, region: RegionFile, seed: int, workers: int = 1):
+        """
+        :param region: Region file to load chunks from
+        :param int seed: World seed for generating missing chunks
+        :param int workers: Number of loader threads
+        """
+        self.region = region
+        self.seed = seed
+
+        # Requests by chunk index, served lowest priority first. The heap keeps
+        # stale entries of cancelled and re-prioritized requests, they are skipped.
+        self._requests: Dict[int, LoadRequest] = {}
+        self._heap: List[Tuple[float, int, int]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        # Completed work
         self.queue_out = Queue(maxsize=-1)
 
-        # Run as daemon thread. This will terminate with the application.
-        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.cancelled = 0
+        self.telemetry = LoaderTelemetry(
+            config.CHUNK_LOADER_SAMPLES,
+            config.CHUNK_LATENCY_BUCKETS,
+            config.CHUNK_THROUGHPUT_WINDOW,
+        )
+
+        # Run as daemon threads. These will terminate with the application.
+        self.threads = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
 
     def start(self):
-        """Start the thread if not already started"""
-        try:
-            if not self.thread.is_alive():
-                print("Starting chunk loader thread")
-                self.thread.start()
-        except RuntimeError:
-            pass
+        """Start the threads if not already started"""
+        for thread in self.threads:
+            if thread.ident is None:
+                thread.start()
+
+    def request(self, chunk_id: int, priority: float):
+        """Queue a chunk for loading"""
+        with self._cond:
+            request = LoadRequest(priority, next(self._seq), chunk_id, perf_counter())
+            self._requests[chunk_id] = request
+            heapq.heappush(self._heap, (priority, request.seq, chunk_id))
+            self._cond.notify()
+
+    def cancel(self, chunk_id: int) -> bool:
+        """Cancel a request. False if it is not queued, or a worker already picked it up."""
+        with self._cond:
+            if self._requests.pop(chunk_id, None) is None:
+                return False
+            self.cancelled += 1
+            return True
+
+    def reprioritize(self, priority: Callable[[int], float]):
+        """Give every queued request a new priority from its chunk index"""
+        with self._cond:
+            self._requests = {
+                chunk_id: request._replace(priority=priority(chunk_id))
+                for chunk_id, request in self._requests.items()
+            }
+            self._heap = [(request.priority, request.seq, chunk_id) for chunk_id, request in self._requests.items()]
+            heapq.heapify(self._heap)
+
+    @property
+    def queued(self) -> int:
+        return len(self._requests)
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Queue size, counts, throughput and percentiles of queue wait and load time in milliseconds"""
+        telemetry = self.telemetry
+        return {
+            "queued": self.queued,
+            "cancelled": self.cancelled,
+            "loaded": telemetry.loaded,
+            "failed": telemetry.failed,
+            "chunks_per_second": telemetry.chunks_per_second,
+            **{f"queue_wait_{k}_ms": v for k, v in telemetry.stage_percentiles("queue_wait").items()},
+            **{f"load_{k}_ms": v for k, v in telemetry.stage_percentiles("load").items()},
+        }
+
+    def _next(self) -> LoadRequest:
+        """Wait for the most important request"""
+        with self._cond:
+            while True:
+                while not self._heap:
+                    self._cond.wait()
+                _, seq, chunk_id = heapq.heappop(self._heap)
+                request = self._requests.get(chunk_id)
+                if request is not None and request.seq == seq:
+                    del self._requests[chunk_id]
+                    return request
 
     def _run(self):
         while True:
             # Wait for a new chunk loading request
-            chunk_id = self.queue_in.get(block=True)
-            # Load the chunk here..
-            chunk_timer = Timer("chunk_load")
-            with gzip.open(config.DATA_DIR / f"pickle{pickle.format_version}_{chunk_id}.pickle") as f:
-                chunk = HorizontalChunk(chunk_id * 16, chunk_id, pickle.load(f))
-            print("Loaded chunk in", chunk_timer.stop())
-
-            # Spread load over more time
-            sp_timer = Timer("chunk_load")
-            i = 0
-            for _ in chunk.make_sprite_list():
-                if i == 50:
-                    time.sleep(0.001)
-                    i = 0
-                i += 1
-            print("Make spritelist in", sp_timer.stop())
-
-            self.queue_out.put(chunk)
-
-            print(f"Loaded chunk {chunk_id} in {chunk_timer.stop()}")
-
-    def get_loaded_chunks(self, max_results=1):
-        chunks = deque()
+            request = self._next()
+            # Only the block data is loaded here, sprites are made on the main thread
+            started_at = perf_counter()
+            self.telemetry.record("queue_wait", started_at - request.requested_at)
+            try:
+                chunk = self._load(request.chunk_id)
+            except Exception as e:
+                # Count it and keep serving other requests
+                self.telemetry.record_failure(e)
+                chunk = None
+            else:
+                self.telemetry.record("load", perf_counter() - started_at)
+                self.telemetry.record_loaded()
+            self.queue_out.put(LoadResult(request.chunk_id, chunk, request.requested_at, perf_counter()))
+
+    def _load(self, chunk_id: int) -> HorizontalChunk:
+        payload = self.region.read(chunk_id)
+        if payload is not None:
+            return HorizontalChunk.decode(chunk_id, payload)
+
+        # First visit to this part of the world, generate and store it
+        chunk = HorizontalChunk(chunk_id * 16, chunk_id, gen_chunk(chunk_id, self.seed))
+        self.region.write(chunk_id, chunk.encode())
+        return chunk
+
+    def get_loaded_chunks(self, max_results: Optional[int] = 1) -> Deque[LoadResult]:
+        """Fetch up to max_results finished loads, all of them when None"""
+        results = deque()
         # Attempt to fetch max_results chunks from the queue
-        for _ in range(max_results):
+        for _ in itertools.repeat(None, max_results) if max_results is not None else itertools.count():
             try:
-                chunk = self.queue_out.get(block=False)
-                chunks.append(chunk)
+                results.append(self.queue_out.get(block=False))
             except Empty:
                 break
 
-        return chunks
+        return results
+
+
+class ChunkWriter:
+    """Writes edited chunks to the region file from a background thread"""
+
+    def __init__(self, region: RegionFile, interval: float):
+        """
+        :param region: Region file to write to
+        :param float interval: Seconds between flushes
+        """
+        self.region = region
+        self.interval = interval
+
+        # Edited chunks waiting to be written. Several edits to a chunk are written once.
+        self._pending: Dict[int, HorizontalChunk] = {}
+        self._lock = threading.Lock()
+        # Serializes flushes from the thread and from close()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+
+        self.flushes = 0
+        self.chunks_written = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """Start the thread if not already started"""
+        if not self.thread.is_alive() and not self._closed:
+            self.thread.start()
+
+    def mark_dirty(self, chunk: HorizontalChunk):
+        """Queue a chunk for writing. Cheap enough to call on every edit."""
+        with self._lock:
+            self._pending[chunk.index] = chunk
+
+    @property
+    def pending(self) -> int:
+        """Number of chunks waiting to be written"""
+        return len(self._pending)
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        return {
+            "pending": self.pending,
+            "flushes": self.flushes,
+            "chunks_written": self.chunks_written,
+            "last_flush_latency": self.last_flush_latency,
+            "max_flush_latency": self.max_flush_latency,
+        }
+
+    def flush(self, chunks: Optional[Iterable[HorizontalChunk]] = None):
+        """Write pending chunks, or only the given ones, to the region file"""
+        # Waits for a flush in progress, so chunks are on disk once this returns
+        with self._flush_lock:
+            with self._lock:
+                if chunks is None:
+                    batch, self._pending = self._pending, {}
+                else:
+                    batch = {c.index: c for c in chunks if self._pending.pop(c.index, None) is not None}
+            if not batch:
+                return
+
+            timer = Timer("chunk_flush")
+            payloads = []
+            for index, chunk in batch.items():
+                if not chunk.dirty:
+                    continue
+                # Cleared before encoding so an edit made meanwhile marks it dirty again
+                chunk.dirty = False
+                payloads.append((index, chunk.encode()))
+            if not payloads:
+                return
+            self.region.write_many(payloads)
+
+            self.last_flush_latency = timer.stop()
+            self.max_flush_latency = max(self.max_flush_latency, self.last_flush_latency)
+            self.flushes += 1
+            self.chunks_written += len(payloads)
+
+    def close(self):
+        """Stop the thread and write everything still pending"""
+        self._closed = True
+        self._wake.set()
+        if self.thread.is_alive():
+            self.thread.join()
+        self.flush()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.interval)
+            self.flush()